@@ -52,8 +52,8 @@ from src.utils.processing_stats import ProcessingStats
 
 if HF_TOKEN and HF_TOKEN.startswith("hf_"):
     try:
-        from src.utils.pyannote_patch import apply_pyannote_patch
-        apply_pyannote_patch()
+        from src.utils.pyannote_patch import install_pyannote_import_hook
+        install_pyannote_import_hook()
     except Exception:
         print("ПРЕДУПРЕЖДЕНИЕ: pyannote patch не применен; продолжаем без него.")
 
@@ -68,10 +68,10 @@ from src.services import transcription_service
 from src.utils.audio_converter import ffmpeg_available
 from src.utils.logger import setup_logger
 from src.utils.processing_stats import ProcessingStats
-from src.utils.pyannote_patch import apply_pyannote_patch
+from src.utils.pyannote_patch import install_pyannote_import_hook
 
-# Применяем патч
-apply_pyannote_patch()
+# Патч применится при первом импорте pyannote.audio, а не на старте CLI
+install_pyannote_import_hook()
 
 # Инициализация
 console = Console()
@@ -2,29 +2,13 @@
 Core модули для обработки транскрибации
 """
 
-import importlib
+from ..lazy_exports import lazy_exports
 
-_LAZY = {
+__all__, __getattr__, __dir__ = lazy_exports(__name__, {
     "ModelLoader": (".model_loader", "ModelLoader"),
     "TranscriptionProcessor": (".processor", "TranscriptionProcessor"),
     "ProgressEvent": (".progress", "ProgressEvent"),
     "ProgressPlan": (".progress", "ProgressPlan"),
     "ProgressStage": (".progress", "ProgressStage"),
     "ProgressCallback": (".progress", "ProgressCallback"),
-}
-
-__all__ = list(_LAZY.keys())
-
-
-def __getattr__(name):
-    target = _LAZY.get(name)
-    if target is None:
-        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
-    module = importlib.import_module(target[0], __name__)
-    value = getattr(module, target[1])
-    globals()[name] = value
-    return value
-
-
-def __dir__():
-    return sorted(list(globals().keys()) + __all__)
+})
@@ -1,6 +1,6 @@
 """Diarization backend contracts and implementations."""
 
-from .base import DiarizationBackend, SpeakerSegment
+from .base import DiarizationBackend, SpeakerSegment, SpeakerTimeline
 from .factory import create_diarization_backend
 
-__all__ = ["DiarizationBackend", "SpeakerSegment", "create_diarization_backend"]
+__all__ = ["DiarizationBackend", "SpeakerSegment", "SpeakerTimeline", "create_diarization_backend"]
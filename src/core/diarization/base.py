@@ -2,10 +2,12 @@
 
 from __future__ import annotations
 
-from collections.abc import Callable
+from collections.abc import Callable, Iterable, Iterator
 from dataclasses import dataclass
 from typing import Protocol, runtime_checkable
 
+import numpy as np
+
 
 @dataclass
 class SpeakerSegment:
@@ -18,6 +20,43 @@ class SpeakerSegment:
         return self.end - self.start
 
 
+@dataclass(frozen=True)
+class SpeakerTimeline:
+    """Сегменты диаризации параллельными массивами, упорядоченные по началу.
+
+    Для поиска по времени нужны три колонки, а не тысячи объектов
+    SpeakerSegment. Метки хранятся int16-кодами: labels[code], коды выданы в
+    порядке первого появления метки во входе. Строка метки нужна только при
+    записи результата. Сортировка устойчивая.
+    """
+
+    starts: np.ndarray
+    ends: np.ndarray
+    codes: np.ndarray
+    labels: tuple[str, ...]
+
+    @classmethod
+    def from_segments(cls, segments: Iterable[SpeakerSegment]) -> SpeakerTimeline:
+        segments = list(segments)
+        count = len(segments)
+        label_codes: dict[str, int] = {}
+        starts = np.fromiter((segment.start for segment in segments), dtype=np.float64, count=count)
+        ends = np.fromiter((segment.end for segment in segments), dtype=np.float64, count=count)
+        codes = [label_codes.setdefault(segment.speaker, len(label_codes)) for segment in segments]
+        code_dtype = np.int16 if len(label_codes) <= np.iinfo(np.int16).max else np.int32
+        codes = np.array(codes, dtype=code_dtype)
+        order = np.argsort(starts, kind="stable")
+        return cls(starts[order], ends[order], codes[order], tuple(label_codes))
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def __iter__(self) -> Iterator[SpeakerSegment]:
+        labels = self.labels
+        for start, end, code in zip(self.starts.tolist(), self.ends.tolist(), self.codes.tolist(), strict=True):
+            yield SpeakerSegment(start, end, labels[code])
+
+
 @runtime_checkable
 class DiarizationBackend(Protocol):
     backend: str
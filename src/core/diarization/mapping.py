@@ -2,15 +2,30 @@
 
 from __future__ import annotations
 
+import bisect
 import math
 
-from .base import SpeakerSegment
+import numpy as np
+
+from .base import SpeakerSegment, SpeakerTimeline
 
 UNKNOWN_SPEAKER = "Неизвестный спикер"
+
+# Слово, не пересёкшееся ни с одним сегментом диаризации, притягивается к
+# ближайшему говорящему в пределах этого допуска. Зазоры между сегментами на
+# паузах — доли секунды; дальше допуска речи уже нет, и «неизвестный» честнее.
 MAX_SPEAKER_SNAP_DISTANCE_SEC = 2.0
+
+# Ниже этого порога одиночное слово не может образовать реплику: у RNNT
+# однотокенное слово занимает один энкодерный фрейм (~80 мс), и его границы
+# слишком грубы, чтобы менять говорящего.
 MIN_SPEAKER_TURN_SEC = 0.4
 TIMELINE_EPSILON_SEC = 1e-6
 
+# С какого размера окна пересечения считаются массивами numpy. На паре-тройке
+# сегментов (обычный случай) накладные расходы numpy больше, чем у цикла.
+_VECTORIZE_MIN_SEGMENTS = 32
+
 
 def _validated_timed_words(trans_seg: dict) -> list[dict]:
     """Return a complete valid word timeline or an empty list for segment fallback."""
@@ -43,19 +58,115 @@ def _validated_timed_words(trans_seg: dict) -> list[dict]:
     return validated
 
 
+class _SpeakerIndex:
+    """Поиск по SpeakerTimeline через окно индексов.
+
+    Без индекса каждое слово сканировало все сегменты записи — O(N·M) на
+    длинных файлах. Сегменты могут перекрываться, поэтому концы по порядку не
+    монотонны; монотонен reach[i] — наибольший конец среди первых i+1
+    сегментов. Всё, что пересекает [lo, hi], лежит в срезе
+    [bisect_left(reach, lo), bisect_right(starts, hi)).
+
+    Колонки дополнительно держатся списками: bisect и короткие циклы по окну
+    на них быстрее поэлементного доступа к numpy; массивы timeline нужны для
+    широких окон. Поиск идёт по кодам спикеров, строка метки берётся из
+    labels только для возвращаемого результата.
+    """
+
+    __slots__ = ("timeline", "starts", "ends", "codes", "labels", "reach")
+
+    def __init__(self, speaker_segments):
+        if not isinstance(speaker_segments, SpeakerTimeline):
+            speaker_segments = SpeakerTimeline.from_segments(speaker_segments)
+        timeline = speaker_segments
+        self.timeline = timeline
+        self.starts = timeline.starts.tolist()
+        self.ends = timeline.ends.tolist()
+        self.codes = timeline.codes.tolist()
+        self.labels = timeline.labels
+        self.reach = np.maximum.accumulate(timeline.ends).tolist()
+
+    def _label(self, index):
+        return None if index is None else self.labels[self.codes[index]]
+
+    def bounds(self, lo, hi):
+        return bisect.bisect_left(self.reach, lo), bisect.bisect_right(self.starts, hi)
+
+    def speaker_at(self, time):
+        left, right = self.bounds(time, time)
+        starts, ends = self.starts, self.ends
+        for i in range(left, right):
+            if starts[i] <= time <= ends[i]:
+                return self._label(i)
+        return None
+
+    def best_overlap(self, start, end):
+        """Спикер с наибольшим пересечением с [start, end] или None.
+
+        Как и цикл по списку, при равенстве выбирает первый сегмент (argmax
+        тоже берёт первый максимум).
+        """
+        left, right = self.bounds(start, end)
+        if right - left >= _VECTORIZE_MIN_SEGMENTS:
+            overlap = (
+                np.minimum(self.timeline.ends[left:right], end)
+                - np.maximum(self.timeline.starts[left:right], start)
+            )
+            best = int(overlap.argmax())
+            if overlap[best] <= 0.0:
+                return None
+            return self._label(left + best)
+        starts, ends = self.starts, self.ends
+        max_overlap = 0.0
+        best_index = None
+        for i in range(left, right):
+            overlap = max(0.0, min(end, ends[i]) - max(start, starts[i]))
+            if overlap > max_overlap:
+                max_overlap = overlap
+                best_index = i
+        return self._label(best_index)
+
+    def nearest(self, start, end, max_distance):
+        left, right = self.bounds(start - max_distance, end + max_distance)
+        starts, ends = self.starts, self.ends
+        best_index = None
+        best_distance = max_distance
+        for i in range(left, right):
+            distance = max(starts[i] - end, start - ends[i], 0.0)
+            if distance < best_distance:
+                best_distance = distance
+                best_index = i
+        return self._label(best_index)
+
+
 class SpeakerMappingMixin:
     def _rename_speakers(self, segments: list[SpeakerSegment]) -> list[SpeakerSegment]:
-        order = list(dict.fromkeys(segment.speaker for segment in segments))
-        names = {name: f"Спикер №{index + 1}" for index, name in enumerate(order)}
+        """Переименовать спикеров в порядке появления за один проход.
+
+        SPEAKER_00 -> Спикер №1
+        SPEAKER_01 -> Спикер №2
+        """
+        names: dict[str, str] = {}
         for segment in segments:
-            segment.speaker = names.get(segment.speaker, segment.speaker)
+            speaker = segment.speaker
+            if speaker not in names:
+                names[speaker] = f"Спикер №{len(names) + 1}"
+            segment.speaker = names[speaker]
         return segments
 
     def map_speakers_to_transcription(
         self,
         transcription_segments: list,
-        speaker_segments: list[SpeakerSegment],
+        speaker_segments: list[SpeakerSegment] | SpeakerTimeline,
     ) -> list:
+        """Сопоставить ASR с диаризацией, сохраняя смены спикеров.
+
+        PyTorch GigaAM передаёт word-level timestamps. В этом случае один
+        длинный ASR-сегмент разбивается на последовательные реплики по словам,
+        а не схлопывается до спикера в midpoint. Backend-ы без word timestamps
+        сохраняют прежний безопасный fallback с одним спикером на ASR-сегмент.
+        """
+        speaker_segments = _SpeakerIndex(speaker_segments)
         mapped = []
         for trans_seg in transcription_segments:
             words = self._resolve_word_speakers(trans_seg, speaker_segments)
@@ -103,6 +214,7 @@ class SpeakerMappingMixin:
             mapped.append(turn)
 
     def _map_segment_without_words(self, trans_seg, speaker_segments):
+        """Один спикер на весь ASR-сегмент — backend не дал word timestamps."""
         segment = dict(trans_seg)
         segment.pop("words", None)
         start, end = segment.get("boundaries", (0.0, 0.0))
@@ -113,6 +225,7 @@ class SpeakerMappingMixin:
         return segment
 
     def _resolve_word_speakers(self, trans_seg, speaker_segments):
+        """Определить говорящего для каждого слова ASR-сегмента."""
         resolved = []
         for word in _validated_timed_words(trans_seg):
             text = word["text"]
@@ -127,6 +240,7 @@ class SpeakerMappingMixin:
         return resolved
 
     def _find_speaker_for_word(self, start, end, speaker_segments):
+        """Говорящий для одного слова: пересечение, затем midpoint, затем ближайший."""
         speaker = self._find_speaker_by_overlap(start, end, speaker_segments)
         if speaker is None:
             speaker = self._find_speaker_at_time((start + end) / 2, speaker_segments)
@@ -136,6 +250,14 @@ class SpeakerMappingMixin:
 
     @staticmethod
     def _smooth_micro_turns(words):
+        """Погасить смену говорящего длиной в одно короткое слово.
+
+        Однотокенное слово занимает у RNNT ровно один энкодерный фрейм (~80 мс).
+        Такая метка слишком груба, чтобы на ней одной ставить смену говорящего
+        посреди чужой реплики: почти всегда это край соседнего сегмента, задетый
+        неточной границей. Настоящая реплика длиннее либо состоит из нескольких
+        слов, поэтому обе такие ситуации сглаживание не трогает.
+        """
         for index in range(1, len(words) - 1):
             previous, current, following = words[index - 1], words[index], words[index + 1]
             if (
@@ -148,6 +270,7 @@ class SpeakerMappingMixin:
 
     @staticmethod
     def _group_words_into_turns(words):
+        """Слить подряд идущие слова одного говорящего в реплику."""
         turns = []
         for word in words:
             timed_word = {
@@ -170,6 +293,13 @@ class SpeakerMappingMixin:
 
     @staticmethod
     def _find_speaker_at_time(time, speaker_segments):
+        """Найти спикера, говорившего в указанный момент времени.
+
+        По индексу — бинарный поиск: кандидаты только сегменты, начавшиеся не
+        позже time и чей reach до time дотягивается.
+        """
+        if isinstance(speaker_segments, _SpeakerIndex):
+            return speaker_segments.speaker_at(time)
         for segment in speaker_segments:
             if segment.start <= time <= segment.end:
                 return segment.speaker
@@ -182,6 +312,15 @@ class SpeakerMappingMixin:
         speaker_segments,
         max_distance=MAX_SPEAKER_SNAP_DISTANCE_SEC,
     ):
+        """Ближайший говорящий для слова, упавшего в паузу между сегментами.
+
+        Диаризация режет речь по паузам и оставляет между сегментами реальные
+        зазоры. Короткое слово может целиком попасть в такой зазор и не пересечься
+        ни с одним сегментом — оно принадлежит ближайшему говорящему, а не
+        «неизвестному». Вдали от речи снап не срабатывает: там незнание честнее.
+        """
+        if isinstance(speaker_segments, _SpeakerIndex):
+            return speaker_segments.nearest(start, end, max_distance)
         best_speaker = None
         best_distance = max_distance
         for segment in speaker_segments:
@@ -193,6 +332,9 @@ class SpeakerMappingMixin:
 
     @staticmethod
     def _find_speaker_by_overlap(start, end, speaker_segments):
+        """Найти спикера с максимальным пересечением по времени."""
+        if isinstance(speaker_segments, _SpeakerIndex):
+            return speaker_segments.best_overlap(start, end)
         max_overlap = 0.0
         best_speaker = None
         for segment in speaker_segments:
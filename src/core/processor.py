@@ -4,9 +4,13 @@
 
 from __future__ import annotations
 
+import copy
 import os
+import queue
+import threading
 import time
 from collections.abc import Callable
+from dataclasses import dataclass
 from typing import TYPE_CHECKING
 
 from ..config import DIARIZATION_BACKEND
@@ -23,6 +27,108 @@ if TYPE_CHECKING:
     from .diarization.base import DiarizationBackend
 
 
+@dataclass
+class PrefetchedConversion:
+    """Результат конвертации, выполненной заранее в фоновом потоке."""
+
+    filepath: str
+    output_dir: str
+    media_duration: float
+    temp_audio: str | None
+    conversion_time: float
+
+
+def _remove_temp_audio(temp_audio: str | None, *sources: str) -> None:
+    """Удалить временный WAV, если это не один из исходных файлов."""
+    if not temp_audio or any(
+        os.path.abspath(temp_audio) == os.path.abspath(source) for source in sources
+    ):
+        return
+    try:
+        os.remove(temp_audio)
+    except OSError:
+        pass
+
+
+class ConversionPrefetch:
+    """Фоновая конвертация следующего файла очереди.
+
+    ffmpeg работает в отдельном процессе, и поток ждёт его с отпущенным GIL,
+    поэтому конвертация файла N+1 идёт параллельно с распознаванием файла N.
+    Очередь на один элемент — слот результата: поток кладёт туда ровно одно
+    значение, а `result()` забирает его (или ждёт, если ffmpeg ещё работает).
+    Сообщения фоновой конвертации помечаются именем файла: они идут в тот же
+    лог, что и прогресс текущего файла.
+    """
+
+    def __init__(self, converter: AudioConverter, filepath: str, output_dir: str):
+        self.filepath = filepath
+        self.output_dir = output_dir
+        tag = os.path.basename(filepath)
+        base_logger = converter.logger
+        self._converter = copy.copy(converter)
+        self._converter.logger = lambda message: base_logger(f"[{tag}] {message}")
+        self._slot: queue.Queue = queue.Queue(maxsize=1)
+        self._value: PrefetchedConversion | None = None
+        self._cancel = threading.Event()
+        self._lock = threading.Lock()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def _run(self) -> None:
+        media_duration = 0.0
+        temp_audio = None
+        start = time.time()
+        try:
+            media_duration = AudioConverter.get_media_duration(self.filepath)
+            start = time.time()
+            temp_audio = self._converter.convert_to_wav(
+                self.filepath,
+                self.output_dir,
+                media_duration=media_duration,
+                cancel_event=self._cancel,
+            )
+        except Exception as exc:
+            self._converter.logger(f"Ошибка фоновой конвертации: {exc}")
+        with self._lock:
+            discarded = self._cancel.is_set()
+            if not discarded:
+                self._slot.put(PrefetchedConversion(
+                    filepath=self.filepath,
+                    output_dir=self.output_dir,
+                    media_duration=media_duration,
+                    temp_audio=temp_audio,
+                    conversion_time=time.time() - start,
+                ))
+        if discarded:
+            self._remove_temp(temp_audio)
+
+    def result(self) -> PrefetchedConversion:
+        """Дождаться окончания конвертации и вернуть её результат (не после discard)."""
+        if self._value is None:
+            self._value = self._slot.get()
+        return self._value
+
+    def discard(self) -> None:
+        """Отменить конвертацию и удалить ненужный временный WAV (отмена/ошибка).
+
+        Не ждёт ffmpeg: он убивается по cancel_event, а WAV, дописанный до
+        отмены, удаляет сам фоновый поток.
+        """
+        with self._lock:
+            self._cancel.set()
+            value = self._value
+            if value is None:
+                try:
+                    value = self._slot.get_nowait()
+                except queue.Empty:
+                    return
+        self._remove_temp(value.temp_audio)
+
+    def _remove_temp(self, temp_audio: str | None) -> None:
+        _remove_temp_audio(temp_audio, self.filepath)
+
+
 class TranscriptionProcessor:
     """Класс для обработки файлов транскрибации"""
 
@@ -145,6 +251,10 @@ class TranscriptionProcessor:
         )
         self._emit_progress(event)
 
+    def prefetch_conversion(self, filepath: str, output_dir: str) -> ConversionPrefetch:
+        """Запустить конвертацию файла в фоне, пока обрабатывается предыдущий."""
+        return ConversionPrefetch(self.audio_converter, filepath, output_dir)
+
     def process_file(self,
                      filepath: str,
                      output_dir: str,
@@ -158,7 +268,8 @@ class TranscriptionProcessor:
                      output_formats: list | None = None,
                      diarization_backend: str = DIARIZATION_BACKEND,
                      audio_preprocessing_mode: str = "off",
-                     subtitle_options: SubtitleOptions | None = None) -> dict:
+                     subtitle_options: SubtitleOptions | None = None,
+                     prefetched: PrefetchedConversion | None = None) -> dict:
         """
         Обрабатывает один файл
 
@@ -176,6 +287,8 @@ class TranscriptionProcessor:
             diarization_backend: backend диаризации (`onnx`, `pyannote` или `sortformer`)
             audio_preprocessing_mode: подготовка аудио (`off`, `auto`, `light` или `denoise`)
             subtitle_options: правила пофразной разбивки SRT/VTT
+            prefetched: готовый результат фоновой конвертации этого файла
+                (см. prefetch_conversion); тогда ffmpeg повторно не запускается
 
         Returns:
             dict: результаты обработки с ключами:
@@ -190,10 +303,23 @@ class TranscriptionProcessor:
         # Используем оригинальное имя если передано, иначе берем из пути
         filename = original_filename if original_filename else os.path.basename(filepath)
         name_without_ext = os.path.splitext(filename)[0]
-        file_size = os.path.getsize(filepath) if os.path.exists(filepath) else 0
+        try:
+            file_size = os.stat(filepath).st_size
+        except OSError:
+            file_size = 0
+
+        if prefetched is not None and (
+            prefetched.filepath != filepath or prefetched.output_dir != output_dir
+        ):
+            # Чужой результат не используется, но его WAV не должен остаться на диске
+            _remove_temp_audio(prefetched.temp_audio, prefetched.filepath, filepath)
+            prefetched = None
 
         # Получаем длительность медиа файла
-        media_duration = AudioConverter.get_media_duration(filepath)
+        if prefetched is not None:
+            media_duration = prefetched.media_duration
+        else:
+            media_duration = AudioConverter.get_media_duration(filepath)
 
         result = {
             'success': False,
@@ -226,19 +352,23 @@ class TranscriptionProcessor:
         self._update_progress("preparing", 0.0, total_seconds=media_duration, processed_seconds=0.0)
 
         # Конвертация
-        conversion_start = time.time()
-        temp_audio = self.audio_converter.convert_to_wav(
-            filepath,
-            output_dir,
-            media_duration=media_duration,
-            progress_callback=lambda value: self._update_progress(
-                "conversion",
-                value,
-                total_seconds=media_duration,
-                processed_seconds=value * media_duration if value is not None and media_duration > 0 else None,
-            ) if value is not None else self._update_progress("conversion", None, total_seconds=media_duration, processed_seconds=None),
-        )
-        result['conversion_time'] = time.time() - conversion_start
+        if prefetched is not None:
+            temp_audio = prefetched.temp_audio
+            result['conversion_time'] = prefetched.conversion_time
+        else:
+            conversion_start = time.time()
+            temp_audio = self.audio_converter.convert_to_wav(
+                filepath,
+                output_dir,
+                media_duration=media_duration,
+                progress_callback=lambda value: self._update_progress(
+                    "conversion",
+                    value,
+                    total_seconds=media_duration,
+                    processed_seconds=value * media_duration if value is not None and media_duration > 0 else None,
+                ) if value is not None else self._update_progress("conversion", None, total_seconds=media_duration, processed_seconds=None),
+            )
+            result['conversion_time'] = time.time() - conversion_start
         # Если конвертер вернул путь, считаем стадию завершенной даже при indeterminate-сценарии.
         # Для известных длительностей FFmpeg уже присылает 1.0 в своем колбэке.
         if media_duration and media_duration > 0 and result['conversion_time'] >= 0:
@@ -439,7 +569,14 @@ class TranscriptionProcessor:
                 timecoded_lines_diarized = []
                 current_speaker = None
 
-                for utt in utterances:
+                # Таймкоды всех границ одним вызовом: [start0, end0, start1, end1, ...]
+                stamps = self.time_formatter.format_timestamps([
+                    value
+                    for utt in utterances
+                    for value in utt.get('boundaries', (0.0, 0.0))
+                ])
+
+                for index, utt in enumerate(utterances):
                     text = utt.get('transcription', '')
                     boundaries = utt.get('boundaries', (0.0, 0.0))
                     speaker = utt.get('speaker', None)
@@ -449,13 +586,11 @@ class TranscriptionProcessor:
                         self.logger(f"ПРЕДУПРЕЖДЕНИЕ: Пустой текст в сегменте {boundaries}")
                         continue
 
-                    start, end = boundaries
+                    time_range = f"[{stamps[2 * index]} - {stamps[2 * index + 1]}]"
 
                     # Обычный текст — всегда без спикеров
                     full_text_lines_plain.append(text)
-                    ts_str_plain = (f"[{self.time_formatter.format_timestamp(start)} - "
-                                    f"{self.time_formatter.format_timestamp(end)}] {text}")
-                    timecoded_lines_plain.append(ts_str_plain)
+                    timecoded_lines_plain.append(f"{time_range} {text}")
 
                     # Диаризованный текст — с метками спикеров только после
                     # реально успешного запуска модели и маппинга.
@@ -466,14 +601,10 @@ class TranscriptionProcessor:
                             full_text_lines_diarized.append(f"[{speaker}]")
                             current_speaker = speaker
                         full_text_lines_diarized.append(text)
-                        ts_str_diarized = (f"[{self.time_formatter.format_timestamp(start)} - "
-                                           f"{self.time_formatter.format_timestamp(end)}] {speaker}: {text}")
-                        timecoded_lines_diarized.append(ts_str_diarized)
+                        timecoded_lines_diarized.append(f"{time_range} {speaker}: {text}")
                     else:
                         full_text_lines_diarized.append(text)
-                        ts_str_diarized = (f"[{self.time_formatter.format_timestamp(start)} - "
-                                           f"{self.time_formatter.format_timestamp(end)}] {text}")
-                        timecoded_lines_diarized.append(ts_str_diarized)
+                        timecoded_lines_diarized.append(f"{time_range} {text}")
 
                 # Декодерные/VAD-границы не являются абзацами. В обычном TXT
                 # склеиваем их пробелом, чтобы не создавать ложные «обрывы» каждые
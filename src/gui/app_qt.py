@@ -6,6 +6,7 @@
 import json
 import os
 import sys
+import threading
 import time
 from pathlib import Path
 
@@ -57,8 +58,6 @@ _OPEN_REQUESTS_NAME = "open_requests.jsonl"
 class WorkerSignals(QObject):
     """Сигналы для потока обработки"""
     log_message = pyqtSignal(str)
-    progress_update = pyqtSignal(int)
-    file_progress_update = pyqtSignal(int)
     current_file_info = pyqtSignal(str)
     processing_finished = pyqtSignal(bool, str)
     stage_update = pyqtSignal(object)
@@ -133,6 +132,10 @@ class GigaTranscriberQtApp(
         self.current_stage_file_progress = 0.0
         self.current_stage_is_indeterminate = False
         self._stage_start_time = 0.0
+        self._progress_lock = threading.Lock()
+        self._pending_progress = None
+        self._last_emitted_stage = None
+        self._last_progress_emit = 0.0
         self._current_filename = ""
         self.is_downloading = False
         self.start_processing_after_download = False
@@ -174,11 +177,14 @@ class GigaTranscriberQtApp(
 
         self.signals = WorkerSignals()
         self.signals.log_message.connect(self._append_log)
-        self.signals.progress_update.connect(self._update_total_progress)
-        self.signals.file_progress_update.connect(self._update_file_progress)
         self.signals.current_file_info.connect(self._update_current_file_info)
         self.signals.processing_finished.connect(self._on_processing_finished)
         self.signals.stage_update.connect(self._on_stage_update)
+        # Досылает придержанный троттлингом прогресс, когда рабочий поток затих
+        self._progress_flush_timer = QTimer(self)
+        self._progress_flush_timer.setSingleShot(True)
+        self._progress_flush_timer.setInterval(int(self._PROGRESS_EMIT_INTERVAL * 1000))
+        self._progress_flush_timer.timeout.connect(self._flush_file_progress)
         self.signals.download_progress.connect(self._update_download_progress)
         self.signals.download_finished.connect(self._on_download_finished)
         self.signals.download_failed.connect(self._on_download_failed)
@@ -214,48 +214,73 @@ class ProcessingMixin:
             failed_names = []
             time_spent = 0.0
             generated_transcript_files = []
-            for i, filepath in enumerate(files):
-                if self._cancel_requested:
-                    self.log(self._t("Обработка отменена пользователем", "Processing cancelled by user"))
-                    break
-                try:
-                    self.current_file_start_time = time.time()
-                    self.signals.current_file_info.emit(os.path.basename(filepath))
-                    file_output_dir = output_dir if output_dir else os.path.dirname(filepath)
-                    result = processor.process_file(
-                        filepath, file_output_dir, i, total_files,
-                        enable_diarization=enable_diarization,
-                        diarization_backend=diarization_backend,
-                        audio_preprocessing_mode=audio_preprocessing_mode,
-                        num_speakers=num_speakers,
-                        output_formats=selected_formats,
-                        subtitle_options=subtitle_options,
-                    )
-                    self.stats.add_processing_record(
-                        file_path=result['file_path'],
-                        file_size=result['file_size'],
-                        duration=result.get('media_duration', 0),
-                        conversion_time=result['conversion_time'],
-                        transcription_time=result['transcription_time'],
-                        success=result['success']
-                    )
-                    if result['success']:
-                        files_processed += 1
-                        for saved_file in result.get('saved_files', []):
-                            if saved_file.lower().endswith(('.txt', '.md', '.srt', '.vtt')):
-                                generated_transcript_files.append(saved_file)
-                    else:
+            # Конвертация следующего файла идёт в фоне, пока распознаётся текущий:
+            # ffmpeg грузит CPU/диск, а распознавание — GPU. Первый файл
+            # конвертируется как раньше, с видимым прогрессом стадии.
+            prefetch_conversion = getattr(processor, "prefetch_conversion", None)
+            pending_prefetch = None
+            # План считаем один раз: имя файла и папка вывода нужны и в цикле,
+            # и для предзагрузки следующего файла, и в сообщениях об ошибке.
+            file_plan = [
+                (filepath, os.path.basename(filepath), output_dir or os.path.dirname(filepath))
+                for filepath in files
+            ]
+            try:
+                for i, (filepath, filename, file_output_dir) in enumerate(file_plan):
+                    if self._cancel_requested:
+                        self.log(self._t("Обработка отменена пользователем", "Processing cancelled by user"))
+                        break
+                    current_prefetch, pending_prefetch = pending_prefetch, None
+                    try:
+                        self.current_file_start_time = time.monotonic()
+                        self._reset_file_progress_throttle()
+                        self.signals.current_file_info.emit(filename)
+                        extra = {}
+                        if current_prefetch is not None:
+                            extra["prefetched"] = current_prefetch.result()
+                        if prefetch_conversion is not None and i + 1 < total_files:
+                            next_path, _, next_output_dir = file_plan[i + 1]
+                            pending_prefetch = prefetch_conversion(next_path, next_output_dir)
+                        result = processor.process_file(
+                            filepath, file_output_dir, i, total_files,
+                            enable_diarization=enable_diarization,
+                            diarization_backend=diarization_backend,
+                            audio_preprocessing_mode=audio_preprocessing_mode,
+                            num_speakers=num_speakers,
+                            output_formats=selected_formats,
+                            subtitle_options=subtitle_options,
+                            **extra,
+                        )
+                        self.stats.add_processing_record(
+                            file_path=result['file_path'],
+                            file_size=result['file_size'],
+                            duration=result.get('media_duration', 0),
+                            conversion_time=result['conversion_time'],
+                            transcription_time=result['transcription_time'],
+                            success=result['success']
+                        )
+                        if result['success']:
+                            files_processed += 1
+                            for saved_file in result.get('saved_files', []):
+                                if saved_file.lower().endswith(('.txt', '.md', '.srt', '.vtt')):
+                                    generated_transcript_files.append(saved_file)
+                        else:
+                            files_failed += 1
+                            failed_names.append(filename)
+                        time_spent += result['total_time']
+                    except Exception as e:
                         files_failed += 1
-                        failed_names.append(os.path.basename(filepath))
-                    time_spent += result['total_time']
-                except Exception as e:
-                    files_failed += 1
-                    failed_names.append(os.path.basename(filepath))
-                    self.log(self._t(f"Ошибка при обработке файла {os.path.basename(filepath)}: {str(e)}", f"Error while processing file {os.path.basename(filepath)}: {str(e)}"))
-                    continue
-                finally:
-                    self.files_processed = files_processed
-                    self.time_spent = time_spent
+                        failed_names.append(filename)
+                        self.log(self._t(f"Ошибка при обработке файла {filename}: {str(e)}", f"Error while processing file {filename}: {str(e)}"))
+                        continue
+                    finally:
+                        self._flush_file_progress()
+                        self.files_processed = files_processed
+                        self.time_spent = time_spent
+            finally:
+                # Отмена или сбой: временный WAV следующего файла больше не нужен.
+                if pending_prefetch is not None:
+                    pending_prefetch.discard()
             total_elapsed = time.time() - start_time
             self.log(self._t("=== ОБРАБОТКА ЗАВЕРШЕНА ===", "=== PROCESSING FINISHED ==="))
             self.log(self._t(f"Общее время обработки: {self.time_formatter.format_duration(total_elapsed)}", f"Total processing time: {self.time_formatter.format_duration(total_elapsed)}"))
@@ -364,6 +389,11 @@ class ProcessingMixin:
         'finalizing': ('Завершение…', 'Finalizing…'),
     }
 
+    # Не чаще одного stage_update в 100 мс внутри стадии: каждый emit из рабочего
+    # потока — это queued-вызов в GUI-потоке, и мелкий прогресс длинного файла
+    # иначе забивает цикл событий.
+    _PROGRESS_EMIT_INTERVAL = 0.1
+
     def _on_file_progress(self, event_or_stage, progress: float | None = None):
         if isinstance(event_or_stage, ProgressEvent):
             event = {
@@ -380,8 +410,40 @@ class ProcessingMixin:
                 "stage_progress": None,
             }
 
+        # Последнее значение лежит в слоте; в GUI уходит сразу при смене стадии
+        # (вслед за придержанным финалом прежней стадии), иначе — не чаще
+        # _PROGRESS_EMIT_INTERVAL. Придержанное значение досылает
+        # _flush_file_progress: по таймеру GUI-потока и по завершении файла.
+        with self._progress_lock:
+            now = time.monotonic()
+            stage = event.get("stage")
+            if (
+                stage == self._last_emitted_stage
+                and now - self._last_progress_emit < self._PROGRESS_EMIT_INTERVAL
+            ):
+                self._pending_progress = event
+                return
+            previous, self._pending_progress = self._pending_progress, None
+            self._last_emitted_stage = stage
+            self._last_progress_emit = now
+        if previous is not None:
+            self.signals.stage_update.emit(previous)
         self.signals.stage_update.emit(event)
 
+    def _flush_file_progress(self):
+        with self._progress_lock:
+            event, self._pending_progress = self._pending_progress, None
+            if event is not None:
+                self._last_progress_emit = time.monotonic()
+        if event is not None:
+            self.signals.stage_update.emit(event)
+
+    def _reset_file_progress_throttle(self):
+        with self._progress_lock:
+            self._pending_progress = None
+            self._last_emitted_stage = None
+            self._last_progress_emit = 0.0
+
     def _on_stage_update(self, event, progress: float | None = None):
         if isinstance(event, ProgressEvent):
             stage = event.stage
@@ -398,11 +460,12 @@ class ProcessingMixin:
 
         if not stage:
             return
+        self._progress_flush_timer.start()
 
         if stage != self.current_stage:
             self.current_stage = str(stage)
             self.current_stage_progress = 0.0 if stage_progress is None else stage_progress
-            self._stage_start_time = time.time()
+            self._stage_start_time = time.monotonic()
 
         if file_progress < self.current_stage_file_progress:
             file_progress = self.current_stage_file_progress
@@ -414,6 +477,9 @@ class ProcessingMixin:
         self._refresh_progress()
 
     def _refresh_progress(self):
+        # Обе полосы, счётчик и стадия обновляются здесь, из одного слота
+        # stage_update: одно событие из рабочего потока даёт один queued-вызов
+        # на все виджеты прогресса, а не по сигналу на каждую полосу.
         if not self.is_processing or self.total_files == 0 or not self.files_to_process:
             return
 
@@ -421,39 +487,47 @@ class ProcessingMixin:
         file_progress = self.current_stage_file_progress
         file_progress = max(0.0, min(file_progress, 1.0))
 
+        # События прогресса приходят чаще, чем меняется целый процент. Виджеты
+        # трогаем только при реальном изменении, чтобы Qt не перерисовывал
+        # полосы и подписи впустую.
         overall = (files_done + file_progress) / self.total_files
-        self.progress_bar_total.setValue(int(overall * 100))
+        self._set_bar_value(self.progress_bar_total, int(overall * 100))
 
         if self.current_stage_is_indeterminate:
-            self.progress_bar_file.setRange(0, 0)
-            self.progress_bar_file.setValue(0)
+            if self.progress_bar_file.maximum() != 0:
+                self.progress_bar_file.setRange(0, 0)
+            self._set_bar_value(self.progress_bar_file, 0)
             if self.current_stage_progress is None:
                 percent_label = "…"
             else:
                 percent_label = ""
         else:
-            self.progress_bar_file.setRange(0, 100)
-            self.progress_bar_file.setValue(int(file_progress * 100))
-            percent_label = f"  {int(file_progress * 100)}%"
+            if self.progress_bar_file.maximum() != 100:
+                self.progress_bar_file.setRange(0, 100)
+            file_pct = int(file_progress * 100)
+            self._set_bar_value(self.progress_bar_file, file_pct)
+            percent_label = f"  {file_pct}%"
 
         current_idx = min(files_done + 1, self.total_files)
-        self.lbl_file_counter.setText(self._t(f"Файл {current_idx} / {self.total_files}", f"File {current_idx} / {self.total_files}"))
+        self._set_label_text(self.lbl_file_counter, self._t(f"Файл {current_idx} / {self.total_files}", f"File {current_idx} / {self.total_files}"))
 
         stage_pair = self._STAGE_NAMES.get(self.current_stage or '', ('Подготовка…', 'Preparing…'))
         stage_name = stage_pair[0] if self._lang == 'ru' else stage_pair[1]
-        self.lbl_stage.setText(f"●  {stage_name}{percent_label}")
+        self._set_label_text(self.lbl_stage, f"●  {stage_name}{percent_label}")
 
+        bar_format = "" if self.current_stage_is_indeterminate else "%p%"
+        if self.progress_bar_file.format() != bar_format:
+            self.progress_bar_file.setFormat(bar_format)
 
-        if not self.current_stage_is_indeterminate:
-            self.progress_bar_file.setFormat("%p%")
-        else:
-            self.progress_bar_file.setFormat("")
-
-    def _update_total_progress(self, value: int):
-        self.progress_bar_total.setValue(value)
+    @staticmethod
+    def _set_bar_value(bar, value: int):
+        if bar.value() != value:
+            bar.setValue(value)
 
-    def _update_file_progress(self, value: int):
-        self.progress_bar_file.setValue(value)
+    @staticmethod
+    def _set_label_text(label, text: str):
+        if label.text() != text:
+            label.setText(text)
 
     def _update_current_file_info(self, info: str):
         self.current_stage = None
@@ -585,6 +659,7 @@ class ProcessingMixin:
             self.user_settings.set_last_files_dir(self.input_dir)
         self._save_ui_settings()
         self._save_geometry()
+        self.user_settings.flush()
         self.app_logger.log_session_end()
         event.accept()
 
@@ -0,0 +1,43 @@
+"""
+Ленивые экспорты пакетов (PEP 562).
+
+Пакеты src.core, src.gui и src.utils отдают публичные имена только при первом
+обращении: часть модулей тянет torch, а он должен импортироваться лишь после
+выбора и активации нужной сборки (см. runtime_manager).
+"""
+
+import importlib
+import sys
+from collections.abc import Callable
+
+
+def lazy_exports(
+    package: str,
+    targets: dict[str, tuple[str, str]],
+) -> tuple[tuple[str, ...], Callable, Callable]:
+    """
+    Построить ``__all__``, ``__getattr__`` и ``__dir__`` для пакета.
+
+    Args:
+        package: имя пакета (``__name__`` вызывающего ``__init__``)
+        targets: имя атрибута -> (относительный модуль, имя в модуле)
+
+    Returns:
+        tuple: (__all__, __getattr__, __dir__)
+    """
+    names = tuple(targets)
+
+    def __getattr__(name):
+        target = targets.get(name)
+        if target is None:
+            raise AttributeError(f"module {package!r} has no attribute {name!r}")
+        module = importlib.import_module(target[0], package)
+        value = getattr(module, target[1])
+        # Кэшируем в пакете, чтобы повторный доступ не доходил до __getattr__
+        setattr(sys.modules[package], name, value)
+        return value
+
+    def __dir__():
+        return sorted(set(vars(sys.modules[package])) | set(names))
+
+    return names, __getattr__, __dir__
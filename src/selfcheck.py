@@ -85,7 +85,8 @@ def _apply_app_patches() -> None:
     вызывает apply_pyannote_patch(), и только потом импортирует pyannote.audio.
     Импорт модуля pyannote_patch на уровне модуля ставит заглушки torchaudio
     backend (set_audio_backend/get_audio_backend удалены в torchaudio 2.10+),
-    а apply_pyannote_patch() переключает загрузку аудио на soundfile.
+    а apply_pyannote_patch() переключает загрузку аудио на soundfile там, где
+    torchcodec не работает (Windows, заглушка torchcodec).
 
     Без этого `import pyannote.audio` в свежем torchaudio падает на
     `AttributeError: module 'torchaudio' has no attribute 'set_audio_backend'` —
@@ -8,10 +8,10 @@
 происходит лениво, при первом доступе.
 """
 
-import importlib
+from ..lazy_exports import lazy_exports
 
 # Имя атрибута -> (модуль, имя_в_модуле)
-_LAZY = {
+__all__, __getattr__, __dir__ = lazy_exports(__name__, {
     'AudioConverter':          ('.audio_converter', 'AudioConverter'),
     'DiarizationManager':      ('.diarization', 'DiarizationManager'),
     'SpeakerSegment':          ('.diarization', 'SpeakerSegment'),
@@ -27,20 +27,4 @@ _LAZY = {
     'TimeFormatter':           ('.time_formatter', 'TimeFormatter'),
     'apply_torch_load_patch':  ('.torch_patch', 'apply_torch_load_patch'),
     'UserSettings':            ('.user_settings', 'UserSettings'),
-}
-
-__all__ = list(_LAZY)
-
-
-def __getattr__(name):
-    target = _LAZY.get(name)
-    if target is None:
-        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
-    module = importlib.import_module(target[0], __name__)
-    value = getattr(module, target[1])
-    globals()[name] = value  # кэшируем, чтобы повторный доступ был быстрым
-    return value
-
-
-def __dir__():
-    return sorted(list(globals().keys()) + __all__)
+})
@@ -23,14 +23,24 @@ def load_json(path: str, default: Any) -> Any:
         return default
 
 
+def dump_json_bytes(data: Any) -> bytes:
+    """Сериализует data в те же UTF-8 байты, что пишет save_json_atomic."""
+    return json.dumps(data, ensure_ascii=False, indent=2).encode('utf-8')
+
+
 def save_json_atomic(path: str, data: Any):
     """Атомарно сохраняет data как JSON в path."""
+    save_bytes_atomic(path, dump_json_bytes(data))
+
+
+def save_bytes_atomic(path: str, payload: bytes):
+    """Атомарно записывает уже сериализованный payload в path."""
     directory = os.path.dirname(os.path.abspath(path))
     os.makedirs(directory, exist_ok=True)
     fd, tmp_path = tempfile.mkstemp(suffix='.tmp', dir=directory)
     try:
-        with os.fdopen(fd, 'w', encoding='utf-8') as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
+        with os.fdopen(fd, 'wb') as f:
+            f.write(payload)
             f.flush()
             os.fsync(f.fileno())
         os.replace(tmp_path, path)
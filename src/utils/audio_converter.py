@@ -3,22 +3,54 @@
 """
 
 import json
+import logging
 import os
 import re
+import shlex
 import shutil
+import stat
+import struct
 import subprocess
 import sys
 import time
 import uuid
+from collections import deque
 from collections.abc import Callable
 from threading import Event, Thread
 
 from ..config import AUDIO_CHANNELS, AUDIO_SAMPLE_RATE
 
+try:
+    from orjson import loads as _json_loads
+except ImportError:  # orjson необязателен: json.loads тоже разбирает bytes
+    _json_loads = json.loads
+
+logger = logging.getLogger(__name__)
+
 # Таймауты для проб длительности (защита от зависания на битых файлах)
 _PROBE_TIMEOUT = 30       # ffprobe
 _FFMPEG_PROBE_TIMEOUT = 120  # ffmpeg -f null (полное декодирование как fallback)
 _CONVERSION_STALL_TIMEOUT = 600  # сек без активности ffmpeg → зависание, убиваем процесс (issue #20)
+_CANCEL_POLL_SEC = 0.2  # как часто watchdog проверяет cancel_event
+_STDERR_TAIL_LINES = 50  # сколько последних строк stderr ffmpeg держим для диагностики ошибки
+
+# Значения -ar/-ac для argv ffmpeg: константы, в строку переводим один раз.
+_SR_STR = str(AUDIO_SAMPLE_RATE)
+_CH_STR = str(AUDIO_CHANNELS)
+
+# Строка "Duration: 00:01:23.45" из лога ffmpeg. Ищем по байтам: stderr ffmpeg
+# может занимать мегабайты, и декодировать его целиком ради одной строки незачем.
+_DURATION_RE = re.compile(rb'Duration: (\d{2}):(\d{2}):(\d{2}\.\d{2})')
+
+# Канонический 44-байтный заголовок WAV: RIFF, fmt-чанк сразу за "WAVE".
+_WAV_HEADER = struct.Struct('<4sI4s4sIHHIIHH')
+_WAVE_FORMAT_PCM = 1
+
+# На POSIX CPython запускает процесс через posix_spawn вместо fork+exec, только
+# если close_fds=False и путь к бинарю абсолютный. fork у процесса с torch в
+# памяти (гигабайты RSS) копирует таблицы страниц и заметно дороже. Утечки
+# дескрипторов нет: с PEP 446 они по умолчанию не наследуются.
+_SPAWN_KWARGS = {} if os.name == 'nt' else {"close_fds": False}
 
 
 def _project_root() -> str:
@@ -54,6 +86,7 @@ def _tool_executable(path: str) -> bool:
             stderr=subprocess.DEVNULL,
             startupinfo=_windows_startupinfo(),
             timeout=10,
+            **_SPAWN_KWARGS,
         )
         return result.returncode == 0
     except (OSError, subprocess.SubprocessError):
@@ -61,6 +94,7 @@ def _tool_executable(path: str) -> bool:
 
 
 _ffmpeg_cached: str | None = None
+_ffprobe_cached: str | None = None
 
 
 def _find_ffmpeg() -> str:
@@ -82,13 +116,48 @@ def _find_ffmpeg() -> str:
 
 
 def _find_ffprobe() -> str | None:
-    """Рабочий ffprobe: проверенный bundled bin/ → проверенный PATH. None если нет."""
+    """Рабочий ffprobe: проверенный bundled bin/ → проверенный PATH. None если нет.
+
+    Найденный путь кэшируется на процесс, чтобы каждая проба длительности не
+    запускала лишний `ffprobe -version`. «Не найден» не кэшируется: ffprobe,
+    поставленный при уже запущенном приложении, подхватится следующей пробой.
+    """
+    global _ffprobe_cached
+    if _ffprobe_cached is not None:
+        return _ffprobe_cached
     for candidate in (_find_bundled_tool('ffprobe'), shutil.which("ffprobe")):
         if candidate and _tool_executable(candidate):
+            _ffprobe_cached = candidate
             return candidate
     return None
 
 
+def _is_model_ready_wav(path: str) -> bool:
+    """True, если файл уже PCM16 WAV с нужными частотой и числом каналов.
+
+    Смотрим только канонический заголовок (fmt — первый чанк). WAV с иной
+    раскладкой чанков просто идёт через ffmpeg, как любой другой файл.
+    """
+    if not path.lower().endswith('.wav'):
+        return False
+    try:
+        with open(path, 'rb') as f:
+            header = f.read(_WAV_HEADER.size)
+    except OSError:
+        return False
+    if len(header) < _WAV_HEADER.size:
+        return False
+    (riff, _, wave, fmt, _, audio_format, channels,
+     sample_rate, _, _, bits_per_sample) = _WAV_HEADER.unpack(header)
+    return (
+        riff == b'RIFF' and wave == b'WAVE' and fmt == b'fmt '
+        and audio_format == _WAVE_FORMAT_PCM
+        and channels == AUDIO_CHANNELS
+        and sample_rate == AUDIO_SAMPLE_RATE
+        and bits_per_sample == 16
+    )
+
+
 def _windows_startupinfo():
     """STARTUPINFO для скрытия консольного окна на Windows (no-op на других ОС)."""
     if os.name != 'nt':
@@ -109,12 +178,25 @@ def ffmpeg_available() -> bool:
 class AudioConverter:
     """Класс для конвертации медиа файлов в WAV формат"""
 
-    def __init__(self, logger=None):
+    def __init__(self, logger=None, debug: bool = False):
         """
         Args:
             logger: функция для логирования (опционально)
+            debug: писать отладочные подробности (путь, команда FFmpeg) в logger;
+                без него они уходят только в logging на уровне DEBUG
         """
         self.logger = logger or print
+        self.debug = debug
+
+    def _debug_enabled(self) -> bool:
+        return self.debug or logger.isEnabledFor(logging.DEBUG)
+
+    def _log_debug(self, message: str, *args):
+        """Отладочное сообщение с ленивым %-форматированием."""
+        if self.debug:
+            self.logger("DEBUG: " + message % args)
+        else:
+            logger.debug(message, *args)
 
     def _log_ffmpeg_tail(self, stderr: str, lines: int = 5):
         """Логирует последние строки stderr ffmpeg для диагностики."""
@@ -147,18 +229,17 @@ class AudioConverter:
                 filepath
             ]
 
+            # JSON ffprobe разбираем прямо из bytes, без текстового декодирования.
             result = subprocess.run(
                 command,
                 capture_output=True,
-                text=True,
-                encoding="utf-8",
-                errors="replace",
                 check=True,
                 startupinfo=_windows_startupinfo(),
                 timeout=_PROBE_TIMEOUT,
+                **_SPAWN_KWARGS,
             )
 
-            data = json.loads(result.stdout)
+            data = _json_loads(result.stdout)
             duration = float(data.get("format", {}).get("duration", 0))
             return duration
 
@@ -166,8 +247,13 @@ class AudioConverter:
                 ValueError, KeyError, FileNotFoundError):
             # Если ffprobe не работает, пробуем альтернативный метод
             try:
+                # -nostats убирает построчный прогресс декодирования: в stderr
+                # остаётся только шапка с Duration, а не мегабайты лога.
                 command = [
                     _find_ffmpeg(),
+                    "-hide_banner",
+                    "-nostdin",
+                    "-nostats",
                     "-i", filepath,
                     "-f", "null",
                     "-"
@@ -175,17 +261,15 @@ class AudioConverter:
 
                 result = subprocess.run(
                     command,
-                    capture_output=True,
-                    text=True,
-                    encoding="utf-8",
-                    errors="replace",
+                    stdout=subprocess.DEVNULL,
+                    stderr=subprocess.PIPE,
                     startupinfo=_windows_startupinfo(),
                     timeout=_FFMPEG_PROBE_TIMEOUT,
+                    **_SPAWN_KWARGS,
                 )
 
                 # Парсим вывод ffmpeg для получения длительности
-                # Ищем строку типа "Duration: 00:01:23.45"
-                duration_match = re.search(r'Duration: (\d{2}):(\d{2}):(\d{2}\.\d{2})', result.stderr)
+                duration_match = _DURATION_RE.search(result.stderr or b"")
                 if duration_match:
                     hours = int(duration_match.group(1))
                     minutes = int(duration_match.group(2))
@@ -203,6 +287,7 @@ class AudioConverter:
         output_dir: str,
         progress_callback: Callable[[float | None], None] | None = None,
         media_duration: float | None = None,
+        cancel_event: Event | None = None,
     ) -> str | None:
         """
         Конвертирует любой входной файл в 16kHz mono wav для модели
@@ -210,51 +295,74 @@ class AudioConverter:
         Args:
             input_path: путь к входному файлу
             output_dir: директория для временного файла
+            cancel_event: если установлен, ffmpeg убивается, недописанный WAV
+                удаляется и возвращается None
 
         Returns:
-            str: путь к конвертированному WAV файлу или None при ошибке
+            str: путь к конвертированному WAV файлу или None при ошибке.
+                Если вход уже 16kHz mono PCM16 WAV, возвращается сам input_path
+                (ffmpeg не запускается, временный файл не создаётся).
         """
-        # Нормализуем путь (решает проблемы с относительными путями и символическими ссылками)
-        input_path = os.path.abspath(os.path.expanduser(input_path))
+        # Нормализуем путь (решает проблемы с относительными путями и символическими ссылками);
+        # абсолютный путь к тому же не примет за опцию ffmpeg имя, начинающееся с «-»
+        input_path = os.path.abspath(os.path.expanduser(os.fspath(input_path)))
 
-        # Проверяем существование файла
-        if not os.path.exists(input_path):
+        # Один stat вместо exists + isfile: на сетевых дисках каждый вызов дорог.
+        try:
+            st = os.stat(input_path)
+        except (FileNotFoundError, NotADirectoryError):
             self.logger(f"ОШИБКА: Файл не найден: {input_path}")
             return None
+        except OSError as exc:
+            self.logger(f"ОШИБКА: Нет доступа к файлу {input_path} ({exc})")
+            return None
 
-        if not os.path.isfile(input_path):
+        if not stat.S_ISREG(st.st_mode):
             self.logger(f"ОШИБКА: Путь не является файлом: {input_path}")
             return None
 
         # Создаём временный файл в папке вывода с уникальным именем,
         # чтобы исключить коллизии при одинаковых basename / параллельных конвертациях.
-        temp_filename = f"temp_{uuid.uuid4().hex}_{os.path.basename(input_path)}.wav"
+        filename = os.path.basename(input_path)
+        if _is_model_ready_wav(input_path):
+            self.logger(f"{filename} уже в формате 16kHz mono WAV — конвертация не нужна.")
+            if progress_callback is not None:
+                progress_callback(1.0)
+            return input_path
+
+        temp_filename = f"temp_{uuid.uuid4().hex}_{filename}.wav"
         temp_wav = os.path.join(output_dir, temp_filename)
 
-        self.logger(f"Конвертация {os.path.basename(input_path)} -> 16kHz WAV...")
+        self.logger(f"Конвертация {filename} -> 16kHz WAV...")
 
-        # Логируем реальный путь для отладки
-        self.logger(f"DEBUG: Абсолютный путь к файлу: {input_path}")
-        self.logger(f"DEBUG: Файл существует: {os.path.exists(input_path)}")
+        if self._debug_enabled():
+            self._log_debug("Путь к файлу: %s (%d байт)", input_path, st.st_size)
 
         try:
             command = [
                 _find_ffmpeg(),
                 "-hide_banner",
                 "-nostdin",
-                "-i", str(input_path),
-                "-ar", str(AUDIO_SAMPLE_RATE),
-                "-ac", str(AUDIO_CHANNELS),
-                "-vn",
+                "-loglevel", "error",
+                # Декодер сам выбирает число потоков; узкое место конвертации
+                # длинных MP4/MKV — именно декодирование.
+                "-threads", "0",
+                "-i", input_path,
+                # Берём только первую аудиодорожку, видео/субтитры/данные не трогаем.
+                "-map", "0:a:0",
+                "-vn", "-sn", "-dn",
+                "-ar", _SR_STR,
+                "-ac", _CH_STR,
+                "-c:a", "pcm_s16le",
+                "-f", "wav",
                 "-y",
                 temp_wav,
                 "-progress", "pipe:1",
                 "-nostats",
             ]
 
-            self.logger(
-                f"DEBUG: Команда FFmpeg: ffmpeg -i [файл] -ar {AUDIO_SAMPLE_RATE} -ac {AUDIO_CHANNELS} -vn -y [выход] -progress pipe:1"
-            )
+            if self._debug_enabled():
+                self._log_debug("Команда FFmpeg: %s", shlex.join(command))
 
             duration = media_duration if media_duration is not None and media_duration > 0 else 0.0
             process = subprocess.Popen(
@@ -265,15 +373,19 @@ class AudioConverter:
                 encoding="utf-8",
                 errors="replace",
                 startupinfo=_windows_startupinfo(),
+                **_SPAWN_KWARGS,
             )
 
-            stderr_lines: list[str] = []
+            # С -loglevel error ffmpeg пишет в stderr только ошибки; кольцевой
+            # буфер всё равно ограничивает память, если их окажется много.
+            stderr_lines: deque[str] = deque(maxlen=_STDERR_TAIL_LINES)
             # Отметка последней активности ffmpeg. Запись одного float атомарна под GIL,
             # поэтому общий список без блокировки безопасен. Watchdog убивает процесс,
             # если активности нет дольше _CONVERSION_STALL_TIMEOUT (issue #20).
             last_activity = [time.monotonic()]
             watchdog_stop = Event()
             killed_by_watchdog = [False]
+            cancelled = [False]
 
             def _bump():
                 last_activity[0] = time.monotonic()
@@ -290,7 +402,16 @@ class AudioConverter:
 
             def _watchdog():
                 poll = max(0.05, min(5.0, _CONVERSION_STALL_TIMEOUT / 4))
+                if cancel_event is not None:
+                    poll = min(poll, _CANCEL_POLL_SEC)
                 while not watchdog_stop.wait(poll):
+                    if cancel_event is not None and cancel_event.is_set():
+                        cancelled[0] = True
+                        try:
+                            process.kill()
+                        except Exception:
+                            pass
+                        return
                     if time.monotonic() - last_activity[0] > _CONVERSION_STALL_TIMEOUT:
                         killed_by_watchdog[0] = True
                         self.logger(
@@ -353,6 +474,14 @@ class AudioConverter:
             if stderr_thread is not None:
                 stderr_thread.join(timeout=1.0)
 
+            if cancelled[0]:
+                self.logger(f"Конвертация {filename} отменена.")
+                try:
+                    os.remove(temp_wav)
+                except OSError:
+                    pass
+                return None
+
             if killed_by_watchdog[0]:
                 self.logger("Конвертация прервана watchdog'ом — файл не обработан (issue #20).")
                 return None
@@ -360,6 +489,7 @@ class AudioConverter:
             if returncode != 0:
                 stderr_text = "".join(stderr_lines).strip()
                 self.logger(f"Ошибка FFmpeg: код возврата {returncode}")
+                self.logger(f"  Команда: {shlex.join(command)}")
                 self._log_ffmpeg_tail(stderr_text)
                 if "moov atom not found" in stderr_text or "Invalid data found when processing input" in stderr_text:
                     self.logger("")
@@ -1,14 +1,51 @@
 """
 Модуль логирования для приложения
 Создает логи в папке logs/ с организацией по датам и времени
+
+Запись в файлы и консоль идёт в фоновом потоке QueueListener: вызов
+logger.info() в цикле транскрибации только кладёт запись в очередь.
 """
 
+import atexit
 import logging
+import queue
 from datetime import datetime
+from logging.handlers import QueueHandler, QueueListener
 from pathlib import Path
 
 from ..config import user_config_dir
 
+_LEVELS = {
+    "debug": logging.DEBUG,
+    "info": logging.INFO,
+    "warning": logging.WARNING,
+    "error": logging.ERROR,
+    "critical": logging.CRITICAL,
+}
+
+# Логгер "GigaAM" общий на процесс, поэтому и слушатель его очереди один
+_listener: QueueListener | None = None
+
+
+@atexit.register
+def _stop_queue_listener():
+    """Дописать очередь и вернуть handlers логгеру напрямую.
+
+    Сообщения после остановки (например, из ещё не завершившегося worker-а)
+    пишутся синхронно, а не теряются в очереди без слушателя.
+    """
+    global _listener
+    listener, _listener = _listener, None
+    if listener is None:
+        return
+    listener.stop()
+    logger = logging.getLogger("GigaAM")
+    for handler in logger.handlers[:]:
+        if isinstance(handler, QueueHandler):
+            logger.removeHandler(handler)
+    for handler in listener.handlers:
+        logger.addHandler(handler)
+
 
 class AppLogger:
     """Класс для настройки и управления логированием"""
@@ -63,9 +100,13 @@ class AppLogger:
 
     def _setup_logger(self) -> logging.Logger:
         """Настраивает и возвращает логгер"""
+        global _listener
         logger = logging.getLogger("GigaAM")
         logger.setLevel(logging.DEBUG)
 
+        # Слушатель прошлой инициализации дописывает очередь и отдаёт handlers
+        _stop_queue_listener()
+
         # Закрываем и очищаем предыдущие handlers (иначе при повторной инициализации
         # утекают файловые дескрипторы)
         for handler in logger.handlers[:]:
@@ -89,7 +130,6 @@ class AppLogger:
         )
         file_handler.setLevel(logging.DEBUG)
         file_handler.setFormatter(formatter)
-        logger.addHandler(file_handler)
 
         # Handler для ошибок (только WARNING и выше)
         error_handler = logging.FileHandler(
@@ -99,13 +139,23 @@ class AppLogger:
         )
         error_handler.setLevel(logging.WARNING)
         error_handler.setFormatter(formatter)
-        logger.addHandler(error_handler)
 
         # Handler для консоли (опционально)
         console_handler = logging.StreamHandler()
         console_handler.setLevel(logging.INFO)
         console_handler.setFormatter(formatter)
-        logger.addHandler(console_handler)
+
+        # Логгер только ставит записи в очередь; уровни handlers соблюдает слушатель
+        log_queue = queue.SimpleQueue()
+        logger.addHandler(QueueHandler(log_queue))
+        _listener = QueueListener(
+            log_queue,
+            file_handler,
+            error_handler,
+            console_handler,
+            respect_handler_level=True,
+        )
+        _listener.start()
 
         return logger
 
@@ -130,6 +180,7 @@ class AppLogger:
         self.logger.info("=" * 60)
         self.logger.info("Сессия завершена")
         self.logger.info("=" * 60)
+        _stop_queue_listener()
 
     @staticmethod
     def cleanup_old_logs(base_dir: str = None, days: int = 30):
@@ -173,16 +224,28 @@ class AppLogger:
 
 
 class LoggerAdapter:
-    """Адаптер для совместимости с существующим кодом"""
+    """Адаптер для совместимости с существующим кодом
+
+    Сообщение ниже уровня логгера отбрасывается сразу, без диспетчеризации в
+    handlers и GUI. Сообщение при этом уже собрано вызывающим кодом, поэтому в
+    горячих циклах дорогие debug-строки стоит строить только под
+    ``if adapter.isEnabledFor(logging.DEBUG)``.
+    """
 
-    def __init__(self, logger: logging.Logger, gui_callback=None):
+    def __init__(self, logger: logging.Logger, gui_callback=None, gui_level: int = logging.NOTSET):
         """
         Args:
             logger: экземпляр logging.Logger
             gui_callback: функция для вывода в GUI (опционально)
+            gui_level: минимальный уровень сообщений для GUI (по умолчанию все)
         """
         self.logger = logger
         self.gui_callback = gui_callback
+        self.gui_level = gui_level
+
+    def isEnabledFor(self, level: int) -> bool:  # noqa: N802 - имя как у logging.Logger
+        """Будет ли сообщение этого уровня куда-либо выведено"""
+        return self.logger.isEnabledFor(level)
 
     def __call__(self, message: str, level: str = "info"):
         """
@@ -192,12 +255,15 @@ class LoggerAdapter:
             message: текст сообщения
             level: уровень логирования (info, warning, error, debug)
         """
+        levelno = _LEVELS.get(level.lower(), logging.INFO)
+        if not self.logger.isEnabledFor(levelno):
+            return
+
         # Логируем в файл
-        log_method = getattr(self.logger, level.lower(), self.logger.info)
-        log_method(message)
+        self.logger.log(levelno, message)
 
         # Если есть GUI callback, выводим и туда
-        if self.gui_callback:
+        if self.gui_callback and levelno >= self.gui_level:
             self.gui_callback(message)
 
     def info(self, message: str):
@@ -1,34 +1,115 @@
 """
 Модуль статистики обработки файлов
+
+История хранится append-only в JSON Lines (<stats>.history.jsonl): запись
+файла — одна дописанная строка, а не перезапись всей истории. Сводка
+по расширениям ведётся накопительными суммами и сохраняется в stats_file
+раз в _SUMMARY_SAVE_INTERVAL записей и при выходе из программы.
 """
 
+import atexit
+import json
 import os
 import threading
+import weakref
 from datetime import datetime
 
 from .atomic_json import load_json, save_json_atomic
 
+# Сводку всё равно можно восстановить из истории, поэтому пишем её редко
+_SUMMARY_SAVE_INTERVAL = 20
+
+# Поля записи, которые суммируются в сводке по расширению
+_TOTAL_FIELDS = ("file_size_mb", "total_duration", "conversion_time", "transcription_time")
+
+_open_stats = weakref.WeakSet()
+
+
+@atexit.register
+def _flush_open_stats():
+    for stats in list(_open_stats):
+        stats.flush()
+
 
 class ProcessingStats:
     """Класс для сбора и анализа статистики обработки файлов"""
 
     def __init__(self, stats_file: str = "processing_stats.json"):
         self.stats_file = stats_file
+        self.history_file = os.path.splitext(stats_file)[0] + ".history.jsonl"
         # Защита от гонок: статистика пишется из worker-потока GUI и читается из главного
         self._lock = threading.Lock()
+        # Расширение -> [count, сумма file_size_mb, total_duration, conversion, transcription]
+        self._totals: dict[str, list[float]] = {}
+        self._unsaved_records = 0
         self.stats: dict = self._load_stats()
+        _open_stats.add(self)
 
     def _load_stats(self) -> dict:
-        """Загрузка статистики из файла (устойчиво к битому JSON)"""
-        return load_json(self.stats_file, {"history": [], "summary": {}})
+        """Загрузка статистики (устойчиво к битому JSON и оборванной строке истории)"""
+        saved = load_json(self.stats_file, {})
+        if not isinstance(saved, dict):
+            saved = {}
+        history = self._read_history()
+        if history is None:
+            # Старый формат: история лежала внутри stats_file
+            history = saved.get("history") or []
+            if history:
+                self._migrate_history(history)
+        self._rebuild_totals(history)
+        return {"history": history, "summary": self._summary_from_totals()}
+
+    def _read_history(self) -> list | None:
+        """Прочитать JSONL-историю; None, если файла ещё нет."""
+        try:
+            with open(self.history_file, encoding="utf-8") as f:
+                lines = f.readlines()
+        except FileNotFoundError:
+            return None
+        except OSError:
+            return []
+        history = []
+        for line in lines:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue  # строка, оборванная падением посреди дозаписи
+            if isinstance(record, dict):
+                history.append(record)
+        return history
+
+    def _migrate_history(self, history: list):
+        """Перенести историю старого формата в JSONL и убрать её из stats_file."""
+        try:
+            with open(self.history_file, "w", encoding="utf-8") as f:
+                f.writelines(json.dumps(record, ensure_ascii=False) + "\n" for record in history)
+            save_json_atomic(self.stats_file, {"summary": {}})
+        except OSError as e:
+            print(f"Ошибка миграции статистики: {e}")
+
+    def _append_record(self, record: dict):
+        """Дописать запись в конец JSONL-истории"""
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(self.history_file)), exist_ok=True)
+            with open(self.history_file, "a", encoding="utf-8") as f:
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+        except OSError as e:
+            print(f"Ошибка сохранения статистики: {e}")
 
     def _save_stats(self):
-        """Атомарное сохранение статистики в файл"""
+        """Атомарное сохранение сводки в файл"""
         try:
-            save_json_atomic(self.stats_file, self.stats)
+            save_json_atomic(self.stats_file, {"summary": self.stats["summary"]})
+            self._unsaved_records = 0
         except OSError as e:
             print(f"Ошибка сохранения статистики: {e}")
 
+    def flush(self):
+        """Сохранить сводку, если с прошлого сохранения были новые записи"""
+        with self._lock:
+            if self._unsaved_records:
+                self._save_stats()
+
     def add_processing_record(self,
                             file_path: str,
                             file_size: int,
@@ -52,34 +133,72 @@ class ProcessingStats:
 
         with self._lock:
             self.stats["history"].append(record)
-            self._update_summary()
-            self._save_stats()
-
-    def _update_summary(self):
-        """Обновление сводной статистики"""
-        if not self.stats["history"]:
-            return
+            self._append_record(record)
+            if self._add_to_totals(record):
+                self.stats["summary"] = self._summary_from_totals()
+            self._unsaved_records += 1
+            if self._unsaved_records >= _SUMMARY_SAVE_INTERVAL:
+                self._save_stats()
+
+    @staticmethod
+    def _record_values(record: dict) -> tuple[str, list[float]] | None:
+        """Расширение и суммируемые поля успешной записи; None — запись не учитывается"""
+        if not record.get("success"):
+            return None
+        try:
+            return str(record["file_extension"]), [float(record[field]) for field in _TOTAL_FIELDS]
+        except (KeyError, TypeError, ValueError):
+            return None
 
-        successful = [r for r in self.stats["history"] if r["success"]]
+    def _rebuild_totals(self, history: list):
+        """Посчитать суммы по всей истории группировкой в NumPy.
 
-        if not successful:
+        Для каждой записи в Python остаётся только извлечение полей, а суммы по
+        расширениям считает bincount. Он складывает веса по порядку, поэтому
+        результат совпадает с поштучным _add_to_totals. Порядок расширений в
+        сводке — по первому появлению, как и при накоплении.
+        """
+        extensions = []
+        rows = []
+        for record in history:
+            parsed = self._record_values(record)
+            if parsed is not None:
+                extensions.append(parsed[0])
+                rows.append(parsed[1])
+        if not rows:
             return
-
-        # Группировка по расширениям
-        by_extension = {}
-        for record in successful:
-            ext = record["file_extension"]
-            if ext not in by_extension:
-                by_extension[ext] = []
-            by_extension[ext].append(record)
-
-        # Расчёт средних значений
+        import numpy as np
+
+        names, first_index, inverse = np.unique(extensions, return_index=True, return_inverse=True)
+        values = np.array(rows, dtype=np.float64)
+        counts = np.bincount(inverse, minlength=len(names))
+        sums = [
+            np.bincount(inverse, weights=values[:, column], minlength=len(names))
+            for column in range(len(_TOTAL_FIELDS))
+        ]
+        for index in np.argsort(first_index).tolist():
+            self._totals[str(names[index])] = [int(counts[index]), *(float(column[index]) for column in sums)]
+
+    def _add_to_totals(self, record: dict) -> bool:
+        """Учесть успешную запись в накопительных суммах; False — запись не учтена"""
+        parsed = self._record_values(record)
+        if parsed is None:
+            return False
+        ext, values = parsed
+        totals = self._totals.setdefault(ext, [0, 0.0, 0.0, 0.0, 0.0])
+        totals[0] += 1
+        for index, value in enumerate(values, start=1):
+            totals[index] += value
+        return True
+
+    def _summary_from_totals(self) -> dict:
+        """Сводная статистика по расширениям из накопительных сумм"""
         summary = {}
-        for ext, records in by_extension.items():
-            avg_size = sum(r["file_size_mb"] for r in records) / len(records)
-            avg_media_duration = sum(r["total_duration"] for r in records) / len(records)
-            avg_conversion = sum(r["conversion_time"] for r in records) / len(records)
-            avg_transcription = sum(r["transcription_time"] for r in records) / len(records)
+        for ext, (count, size, media_duration, conversion, transcription) in self._totals.items():
+            avg_size = size / count
+            avg_media_duration = media_duration / count
+            avg_conversion = conversion / count
+            avg_transcription = transcription / count
             avg_total_time = avg_conversion + avg_transcription
 
             # Коэффициент обработки: секунды обработки на секунду аудио
@@ -90,7 +209,7 @@ class ProcessingStats:
             transcription_ratio = avg_transcription / avg_media_duration if avg_media_duration > 0 else 0.95
 
             summary[ext] = {
-                "count": len(records),
+                "count": count,
                 "avg_size_mb": round(avg_size, 2),
                 "avg_media_duration_sec": round(avg_media_duration, 2),
                 "avg_conversion_sec": round(avg_conversion, 2),
@@ -100,7 +219,7 @@ class ProcessingStats:
                 "transcription_ratio": round(transcription_ratio, 3)
             }
 
-        self.stats["summary"] = summary
+        return summary
 
     def estimate_processing_time(self, file_path: str, media_duration: float) -> float:
         """
@@ -113,40 +232,40 @@ class ProcessingStats:
         Returns:
             Оценка времени обработки в секундах
         """
+        summary = self.stats.get("summary", {})
         file_ext = os.path.splitext(file_path)[1].lower()
+        # Общий коэффициент нужен только для расширений без статистики
+        fallback_ratio = None if file_ext in summary else self._fallback_ratio()
+        return self._estimate(file_ext, media_duration, summary, fallback_ratio)
+
+    def _fallback_ratio(self) -> float:
+        """Средний коэффициент обработки по всей истории (0.5 без истории)"""
+        total_ratios = [
+            (r["conversion_time"] + r["transcription_time"]) / r["total_duration"]
+            for r in self.stats.get("history", [])
+            if r["success"] and r.get("total_duration", 0) > 0
+        ]
+        if total_ratios:
+            return sum(total_ratios) / len(total_ratios)
+        # Дефолтная оценка: 0.5x (на 1 минуту аудио = ~30 секунд обработки)
+        # Это консервативная оценка, реальная скорость зависит от железа
+        return 0.5
 
+    @staticmethod
+    def _estimate(file_ext: str, media_duration: float, summary: dict, fallback_ratio: float | None) -> float:
         # Если нет длительности, используем дефолтную оценку
         if media_duration <= 0:
             return 30.0  # Минимальная оценка
 
-        # Если есть статистика по этому расширению
-        if file_ext in self.stats.get("summary", {}):
-            ext_stats = self.stats["summary"][file_ext]
-            processing_ratio = ext_stats.get("processing_ratio", 1.0)
-
-            # Оценка: длительность_медиа * коэффициент_обработки
-            estimated = media_duration * processing_ratio
-            return max(estimated, 5)  # Минимум 5 секунд
-
-        # Если нет статистики по расширению, используем общую
-        all_records = [r for r in self.stats.get("history", []) if r["success"] and r.get("total_duration", 0) > 0]
-        if all_records:
-            # Средний коэффициент обработки по всем файлам
-            total_ratios = []
-            for r in all_records:
-                media_dur = r["total_duration"]
-                processing_time = r["conversion_time"] + r["transcription_time"]
-                if media_dur > 0:
-                    total_ratios.append(processing_time / media_dur)
-
-            if total_ratios:
-                avg_ratio = sum(total_ratios) / len(total_ratios)
-                estimated = media_duration * avg_ratio
-                return max(estimated, 5)
+        # Если есть статистика по этому расширению — её коэффициент, иначе общий
+        ext_stats = summary.get(file_ext)
+        if ext_stats is not None:
+            ratio = ext_stats.get("processing_ratio", 1.0)
+        else:
+            ratio = fallback_ratio
 
-        # Дефолтная оценка: 0.5x (на 1 минуту аудио = ~30 секунд обработки)
-        # Это консервативная оценка, реальная скорость зависит от железа
-        return max(media_duration * 0.5, 5)
+        # Оценка: длительность_медиа * коэффициент_обработки, минимум 5 секунд
+        return max(media_duration * ratio, 5)
 
     def estimate_batch_time(self, files: list[tuple]) -> dict:
         """
@@ -158,11 +277,17 @@ class ProcessingStats:
         Returns:
             Словарь с оценками времени для каждого файла и общее время
         """
+        summary = self.stats.get("summary", {})
+        fallback_ratio = None
         estimates = {}
         total_time = 0
 
         for file_path, media_duration in files:
-            estimated_time = self.estimate_processing_time(file_path, media_duration)
+            file_ext = os.path.splitext(file_path)[1].lower()
+            if fallback_ratio is None and file_ext not in summary:
+                # Проход по истории — один раз на пакет, а не на каждый файл
+                fallback_ratio = self._fallback_ratio()
+            estimated_time = self._estimate(file_ext, media_duration, summary, fallback_ratio)
             estimates[file_path] = estimated_time
             total_time += estimated_time
 
@@ -16,8 +16,6 @@ import types
 import warnings
 from typing import NamedTuple
 
-import numpy as np
-
 # Mock torchcodec: pyannote.audio пытается импортировать torchcodec при загрузке
 # io.py. В окружениях без torchcodec (портативная сборка) или со сломанным
 # torchcodec (Docker, хрупкая линковка ffmpeg) вставляем заглушку, чтобы
@@ -28,6 +26,7 @@ if "torchcodec" not in sys.modules:
     except Exception:
         _mock_tc = types.ModuleType("torchcodec")
         _mock_tc.__version__ = "0.0.0-mock"
+        _mock_tc._gigaam_mock = True
         _mock_tc.__path__ = []
         _mock_tc.__spec__ = importlib.machinery.ModuleSpec("torchcodec", None)
 
@@ -49,18 +48,54 @@ from .torch_patch import apply_torch_load_patch
 # Применяем патч сразу при импорте модуля
 apply_torch_load_patch()
 
+logger = logging.getLogger(__name__)
+
 
 def _audio_array_to_waveform(audio_data, torch_module):
-    """Convert soundfile's (time, channels) arrays to pyannote layout."""
-    if isinstance(audio_data, np.ndarray):
-        waveform = torch_module.from_numpy(audio_data).float()
-    else:
-        waveform = torch_module.tensor(audio_data).float()
-    if waveform.ndim == 1:
-        return waveform.unsqueeze(0)
-    if waveform.ndim == 2:
-        return waveform.transpose(0, 1)
-    return waveform
+    """Convert soundfile's (time, channels) arrays to pyannote layout.
+
+    float32-массив от sf.read(dtype="float32") не копируется: from_numpy делит
+    с ним память. Моно (time, 1) после .T уже непрерывен; многоканальное аудио
+    копируется один раз в непрерывный (channels, time).
+    """
+    import numpy as np
+
+    audio_data = np.asarray(audio_data, dtype=np.float32)
+    if audio_data.ndim == 1:
+        audio_data = audio_data[np.newaxis, :]
+    elif audio_data.ndim == 2:
+        audio_data = np.ascontiguousarray(audio_data.T)
+    return torch_module.from_numpy(audio_data)
+
+
+def _read_audio_float32(file_path):
+    """Прочитать файл в заранее выделенный float32-буфер (frames, channels).
+
+    Одна аллокация ровно frames×channels×4 байт, без промежуточного float64.
+    Буфер (time, channels), а не (channels, time): soundfile пишет только в
+    C-непрерывный out, а для моно .T всё равно даёт представление без копии.
+    """
+    import numpy as np
+    import soundfile as sf
+
+    with sf.SoundFile(file_path) as audio_file:
+        samples = np.empty((audio_file.frames, audio_file.channels), dtype=np.float32)
+        # read(out=...) возвращает срез, если кадров оказалось меньше заявленного
+        samples = audio_file.read(out=samples)
+        return samples, audio_file.samplerate
+
+
+def _load_audio_with_soundfile(file_path):
+    """Загружает аудио через soundfile и возвращает в формате pyannote
+
+    waveform — float32-тензор (channels, samples), как у torchaudio.load: стерео
+    остаётся двумя каналами, моно — (1, samples) без копирования.
+    """
+    import torch
+
+    audio_data, sample_rate = _read_audio_float32(os.fspath(file_path))
+    return {"waveform": _audio_array_to_waveform(audio_data, torch), "sample_rate": sample_rate}
+
 
 # Флаг идемпотентности: pyannote-патч применяется только один раз за процесс,
 # чтобы повторные вызовы не оборачивали Pipeline.__call__ многократно.
@@ -171,7 +206,7 @@ def apply_torchaudio_backend_patch() -> bool:
                 if not hasattr(backend, name):
                     setattr(backend, name, type(name, (), {}))
 
-        logging.getLogger(__name__).debug("Применён адаптер torchaudio backend")
+        logger.debug("Применён адаптер torchaudio backend")
         return True
 
     except ImportError:
@@ -185,47 +220,113 @@ def apply_torchaudio_backend_patch() -> bool:
 apply_torchaudio_backend_patch()
 
 
+def _prepare_pyannote_import():
+    """Всё, что должно случиться ДО импорта pyannote.audio."""
+    apply_torch_load_patch()
+    apply_torchaudio_backend_patch()
+
+    import numpy as np
+
+    # Патч для совместимости numpy 2.x с pyannote.audio
+    # pyannote использует устаревшие np.NaN и np.NAN которые удалены в NumPy 2.0
+    np.NaN = np.nan
+    np.NAN = np.nan
+
+    # Подавляем предупреждение о torchcodec, и только из pyannote.audio.core.io.
+    # Текст начинается с перевода строки, а "." его не захватывает, поэтому
+    # прежний шаблон ".*torchcodec.*" это предупреждение не ловил
+    warnings.filterwarnings(
+        "ignore", message=r"\s*torchcodec", category=UserWarning, module=r"pyannote\.audio\.core\.io"
+    )
+
+
+class _PatchingLoader:
+    """Загрузчик-обёртка: исполняет pyannote.audio и сразу применяет патч."""
+
+    def __init__(self, loader):
+        self._loader = loader
+
+    def __getattr__(self, name):
+        return getattr(self._loader, name)
+
+    def create_module(self, spec):
+        return self._loader.create_module(spec)
+
+    def exec_module(self, module):
+        self._loader.exec_module(module)
+        apply_pyannote_patch()
+
+
+class _PyannoteImportHook:
+    """Meta path finder, откладывающий патч до первого import pyannote.audio.
+
+    Сам spec ищут остальные finder-ы (в том числе PyInstaller), hook только
+    подготавливает окружение до исполнения модуля и патчит после.
+    """
+
+    def find_spec(self, fullname, path, target=None):
+        if fullname != "pyannote.audio":
+            return None
+        if self in sys.meta_path:
+            sys.meta_path.remove(self)
+        _prepare_pyannote_import()
+        for finder in sys.meta_path:
+            find_spec = getattr(finder, "find_spec", None)
+            if find_spec is None:
+                continue
+            spec = find_spec(fullname, path, target)
+            if spec is not None:
+                if spec.loader is not None:
+                    spec.loader = _PatchingLoader(spec.loader)
+                return spec
+        return None
+
+
+def install_pyannote_import_hook():
+    """Применить pyannote-патч при первом импорте pyannote.audio.
+
+    В отличие от apply_pyannote_patch() не импортирует pyannote сам: запуск
+    без диаризации не платит за его загрузку. Если pyannote уже импортирован —
+    патч применяется сразу.
+    """
+    if "pyannote.audio" in sys.modules:
+        apply_pyannote_patch()
+        return
+    if not any(isinstance(finder, _PyannoteImportHook) for finder in sys.meta_path):
+        sys.meta_path.insert(0, _PyannoteImportHook())
+
+
+def _needs_soundfile_pipeline_call() -> bool:
+    """Нужна ли обёртка Pipeline.__call__, подменяющая загрузку пути на soundfile.
+
+    Штатный загрузчик pyannote работает через torchcodec: на Windows он не
+    находит DLL FFmpeg, а без torchcodec (заглушка выше) не работает нигде.
+    В остальных случаях обёртка — лишний кадр на каждом вызове pipeline.
+    """
+    if sys.platform == "win32":
+        return True
+    torchcodec = sys.modules.get("torchcodec")
+    return torchcodec is None or getattr(torchcodec, "_gigaam_mock", False)
+
+
 def apply_pyannote_patch():
     """Применяет патч для работы pyannote.audio через soundfile (идемпотентно)"""
     global _PYANNOTE_PATCH_APPLIED
     # После горячей смены runtime torchaudio/pyannote удаляются из sys.modules,
     # а этот модуль может остаться загруженным. Поэтому адаптер проверяется при
     # каждом вызове, а идемпотентность обёртки хранится на текущем Pipeline.
-    apply_torch_load_patch()
-    apply_torchaudio_backend_patch()
+    _prepare_pyannote_import()
     try:
-        import soundfile as sf
-        import torch
-
-        # Патч для совместимости numpy 2.x с pyannote.audio
-        # pyannote использует устаревшие np.NaN и np.NAN которые удалены в NumPy 2.0
-        # ВАЖНО: Применяем ДО импорта pyannote
-        if not hasattr(np, "NaN"):
-            np.NaN = np.nan
-        if not hasattr(np, "NAN"):
-            np.NAN = np.nan
-
-        # Также добавляем в атрибуты модуля numpy напрямую
-        np.NaN = np.nan
-        np.NAN = np.nan
-
-        # Подавляем предупреждения о torchcodec
-        warnings.filterwarnings("ignore", message=".*torchcodec.*")
+        import soundfile  # noqa: F401 - без soundfile патч бессмыслен
+        import torch  # noqa: F401
 
         # Monkey patch для работы с pyannote.audio 4.0.2+
         try:
             import pyannote.audio.core.io as io_module
             from pyannote.audio import Pipeline
 
-            # Создаем функцию-обертку для загрузки аудио через soundfile
-            def _load_audio_with_soundfile(file_path):
-                """Загружает аудио через soundfile и возвращает в формате pyannote"""
-                audio_data, sample_rate = sf.read(file_path)
-                audio_tensor = _audio_array_to_waveform(audio_data, torch)
-                return {"waveform": audio_tensor, "sample_rate": sample_rate}
-
             # Защита от повторной обёртки текущего Pipeline.
-            if not getattr(Pipeline.__call__, "_gigaam_patched", False):
+            if _needs_soundfile_pipeline_call() and not getattr(Pipeline.__call__, "_gigaam_patched", False):
                 # Сохраняем оригинальный __call__ метод Pipeline
                 _original_pipeline_call = Pipeline.__call__
 
@@ -265,13 +366,15 @@ def apply_pyannote_patch():
                 io_module.AudioDecoder = AudioDecoder
 
             _PYANNOTE_PATCH_APPLIED = True
-            logging.getLogger(__name__).debug("Pyannote.audio патч успешно применён")
+            logger.debug("Pyannote.audio патч успешно применён")
 
         except Exception as e:
             # Если не удалось сделать monkey patch, продолжаем с предупреждениями
-            logging.getLogger(__name__).warning(
-                "Не удалось применить monkey patch для pyannote.audio: %s", e, exc_info=True
+            # Полный traceback форматируется только при включённом DEBUG
+            logger.warning(
+                "Не удалось применить monkey patch для pyannote.audio: %s", e,
+                exc_info=logger.isEnabledFor(logging.DEBUG),
             )
 
     except ImportError as e:
-        logging.getLogger(__name__).warning("Не удалось импортировать soundfile для патча: %s", e)
+        logger.warning("Не удалось импортировать soundfile для патча: %s", e)
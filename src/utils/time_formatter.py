@@ -2,6 +2,11 @@
 Модуль форматирования времени
 """
 
+# Двузначные поля таймкода готовыми строками: таймкод строится на каждый
+# сегмент субтитров, а разбор формата :02d на каждый вызов заметен.
+_TWO = tuple(f"{i:02d}" for i in range(100))
+_TABLE_LIMIT_SEC = 100 * 3600
+
 
 class TimeFormatter:
     """Класс для форматирования времени в различные форматы"""
@@ -17,12 +22,49 @@ class TimeFormatter:
         Returns:
             str: форматированный таймкод
         """
-        m, s = divmod(seconds, 60)
-        h, m = divmod(m, 60)
+        total = int(seconds)
+        if not 0 <= total < _TABLE_LIMIT_SEC:
+            # Отрицательное время и 100+ часов — вне таблицы, редкий путь
+            m, s = divmod(seconds, 60)
+            h, m = divmod(m, 60)
+            if h > 0:
+                return f"{int(h):02d}:{int(m):02d}:{int(s):02d}"
+            return f"{int(m):02d}:{int(s):02d}"
 
-        if h > 0:
-            return f"{int(h):02d}:{int(m):02d}:{int(s):02d}"
-        return f"{int(m):02d}:{int(s):02d}"
+        s = total % 60
+        m = (total // 60) % 60
+        h = total // 3600
+        if h:
+            return f"{_TWO[h]}:{_TWO[m]}:{_TWO[s]}"
+        return f"{_TWO[m]}:{_TWO[s]}"
+
+    @staticmethod
+    def format_timestamps(seconds) -> list[str]:
+        """
+        format_timestamp для всех значений сразу (таймкоды всего транскрипта)
+
+        Деление на часы/минуты/секунды идёт в NumPy одним проходом; значения вне
+        таблицы уходят в format_timestamp поштучно.
+
+        Args:
+            seconds: последовательность времён в секундах
+
+        Returns:
+            list[str]: таймкоды в том же порядке
+        """
+        import numpy as np
+
+        values = np.asarray(seconds, dtype=np.float64)
+        total = values.astype(np.int64)
+        s = (total % 60).tolist()
+        m = (total // 60 % 60).tolist()
+        h = (total // 3600).tolist()
+        in_table = ((total >= 0) & (total < _TABLE_LIMIT_SEC)).tolist()
+        return [
+            (f"{_TWO[hi]}:{_TWO[mi]}:{_TWO[si]}" if hi else f"{_TWO[mi]}:{_TWO[si]}")
+            if ok else TimeFormatter.format_timestamp(value)
+            for hi, mi, si, ok, value in zip(h, m, s, in_table, values.tolist(), strict=True)
+        ]
 
     @staticmethod
     def format_duration(seconds: float) -> str:
@@ -35,13 +77,11 @@ class TimeFormatter:
         Returns:
             str: читаемая длительность (например "2 мин 30 сек")
         """
-        if seconds < 60:
-            return f"{int(seconds)} сек"
-        elif seconds < 3600:
-            m = int(seconds / 60)
-            s = int(seconds % 60)
+        total = int(seconds)
+        if total < 60:
+            return f"{total} сек"
+        m, s = divmod(total, 60)
+        if m < 60:
             return f"{m} мин {s} сек"
-        else:
-            h = int(seconds / 3600)
-            m = int((seconds % 3600) / 60)
-            return f"{h} ч {m} мин"
+        h, m = divmod(m, 60)
+        return f"{h} ч {m} мин"
@@ -10,24 +10,28 @@
 которые используют torch.load (transformers, pyannote.audio, и т.д.)
 """
 
+import functools
 import logging
 import os
 import warnings
 
+from packaging.version import InvalidVersion, Version
+
 # Флаг для отслеживания применения патча
 _TORCH_PATCH_APPLIED = False
 
 
 def _parse_torch_version(version: str) -> tuple:
-    """Извлекает (major, minor) из строки версии torch, устойчиво к суффиксам (+cu124, a0, dev)."""
-    base = version.split("+")[0]
-    parts = []
-    for chunk in base.split(".")[:2]:
-        digits = "".join(c for c in chunk if c.isdigit())
-        parts.append(int(digits) if digits else 0)
-    while len(parts) < 2:
-        parts.append(0)
-    return tuple(parts)
+    """Извлекает (major, minor) из release-части версии по PEP 440.
+
+    Суффиксы (+cu124, a0, .dev20240101) не влияют: ночная сборка 2.6 уже
+    грузит с weights_only=True, поэтому считается 2.6, а не «меньше 2.6».
+    """
+    try:
+        release = Version(str(version)).release
+    except InvalidVersion:
+        return (0, 0)
+    return (release + (0,))[:2]
 
 
 def apply_torch_load_patch():
@@ -67,6 +71,12 @@ def apply_torch_load_patch():
             # Сохраняем оригинальную функцию
             _original_torch_load = torch.load
 
+            # functools.partial(weights_only=False) тут не годится: Lightning
+            # передаёт weights_only=None явно, и partial отдал бы его в torch,
+            # где None означает новый дефолт True. wraps сохраняет сигнатуру
+            # для inspect.signature (по ней библиотеки проверяют параметры
+            # torch.load) и даёт __wrapped__ с оригиналом.
+            @functools.wraps(_original_torch_load)
             def _patched_torch_load(*args, **kwargs):
                 """
                 Патченная версия torch.load с weights_only=False по умолчанию.
@@ -82,9 +92,12 @@ def apply_torch_load_patch():
             _patched_torch_load._gigaam_weights_only_patch = True
             torch.load = _patched_torch_load
 
-            # Подавляем предупреждения о небезопасной загрузке
+            # Подавляем предупреждения о небезопасной загрузке (их выдаёт torch.serialization)
             warnings.filterwarnings(
-                "ignore", message=".*You are using `torch.load` with `weights_only=False`.*", category=FutureWarning
+                "ignore",
+                message=".*You are using `torch.load` with `weights_only=False`.*",
+                category=FutureWarning,
+                module=r"torch\.serialization",
             )
 
             _TORCH_PATCH_APPLIED = True
@@ -2,11 +2,99 @@
 Модуль для сохранения пользовательских настроек приложения
 """
 
+import atexit
+import copy
+import hashlib
 import os
 import sys
+import threading
+import time
+import weakref
 from pathlib import Path
 
-from .atomic_json import load_json, save_json_atomic
+from .atomic_json import dump_json_bytes, load_json, save_bytes_atomic
+
+try:
+    import orjson
+except ImportError:  # orjson необязателен: без него настройки пишет стандартный json
+    orjson = None
+
+# Пауза, за которую серия изменений (выбор пачки файлов, сохранение всех
+# полей формы) сливается в одну запись на диск
+_SAVE_DELAY_SEC = 0.5
+# Сколько геттеры доверяют прошлой проверке os.path.isdir
+_ISDIR_TTL_SEC = 2.0
+
+_open_settings = weakref.WeakSet()
+
+
+def _dump_settings(settings: dict) -> bytes:
+    """Сериализовать настройки; orjson, если установлен, иначе как save_json_atomic.
+
+    Значения, которые orjson не принимает (int шире 64 бит и т.п.), уходят в
+    стандартный json.
+    """
+    if orjson is not None:
+        try:
+            return orjson.dumps(settings, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+        except TypeError:
+            pass
+    return dump_json_bytes(settings)
+
+
+class _DebouncedSaver:
+    """Один фоновый поток на процесс, дописывающий отложенные сохранения.
+
+    Поток создаётся один раз и ждёт на Condition: серия изменений не плодит
+    по потоку на каждый сеттер.
+    """
+
+    def __init__(self):
+        self._condition = threading.Condition()
+        self._due: dict = {}  # UserSettings -> time.monotonic() записи
+        self._thread: threading.Thread | None = None
+
+    def start(self):
+        with self._condition:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="user-settings-saver", daemon=True)
+                self._thread.start()
+
+    def schedule(self, settings):
+        with self._condition:
+            self._due[settings] = time.monotonic() + _SAVE_DELAY_SEC
+            self._condition.notify()
+
+    def cancel(self, settings):
+        with self._condition:
+            self._due.pop(settings, None)
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while not self._due:
+                    self._condition.wait()
+                settings, deadline = min(self._due.items(), key=lambda item: item[1])
+                delay = deadline - time.monotonic()
+                if delay > 0:
+                    self._condition.wait(delay)
+                    continue
+                del self._due[settings]
+            try:
+                settings.flush()
+            except Exception as e:  # noqa: BLE001 - поток сохранения не должен умирать
+                print(f"Ошибка сохранения настроек: {e}")
+
+
+_saver = _DebouncedSaver()
+
+
+@atexit.register
+def _flush_open_settings(settings_file: str | None = None):
+    """Дописать отложенные сохранения (всех экземпляров или только для settings_file)"""
+    for settings in list(_open_settings):
+        if settings_file is None or settings.settings_file == settings_file:
+            settings.flush()
 
 
 def _default_settings_file() -> str:
@@ -34,18 +122,60 @@ class UserSettings:
             settings_file: путь к файлу с настройками
         """
         self.settings_file = str(settings_file) if settings_file is not None else _default_settings_file()
+        self._lock = threading.Lock()
+        # Снимок настроек на момент последнего _save_settings; None — всё записано
+        self._pending: dict | None = None
+        # Хэш последних записанных байтов: повторное сохранение того же содержимого пропускается
+        self._last_hash: bytes | None = None
+        # Путь -> (time.monotonic() проверки, результат os.path.isdir)
+        self._isdir_cache: dict[str, tuple[float, bool]] = {}
+        # Несохранённые изменения другого экземпляра должны попасть в файл до чтения
+        _flush_open_settings(self.settings_file)
         self.settings: dict = self._load_settings()
+        _open_settings.add(self)
+        _saver.start()
 
     def _load_settings(self) -> dict:
         """Загрузка настроек из файла (устойчиво к битому JSON)"""
         return load_json(self.settings_file, {})
 
     def _save_settings(self):
-        """Атомарное сохранение настроек в файл"""
-        try:
-            save_json_atomic(self.settings_file, self.settings)
-        except OSError as e:
-            print(f"Ошибка сохранения настроек: {e}")
+        """Запланировать сохранение: запись откладывается на _SAVE_DELAY_SEC после последнего изменения
+
+        Сериализуется копия, снятая здесь, в потоке-владельце settings: фоновый
+        поток не читает словарь, который GUI продолжает менять.
+        """
+        snapshot = copy.deepcopy(self.settings)
+        with self._lock:
+            self._pending = snapshot
+        _saver.schedule(self)
+
+    def flush(self):
+        """Атомарно записать настройки в файл, если есть несохранённые изменения"""
+        _saver.cancel(self)
+        with self._lock:
+            snapshot, self._pending = self._pending, None
+            if snapshot is None:
+                return
+            payload = _dump_settings(snapshot)
+            digest = hashlib.blake2b(payload, digest_size=8).digest()
+            if digest == self._last_hash:
+                return
+            try:
+                save_bytes_atomic(self.settings_file, payload)
+                self._last_hash = digest
+            except OSError as e:
+                print(f"Ошибка сохранения настроек: {e}")
+
+    def _isdir_cached(self, path: str) -> bool:
+        """os.path.isdir с кэшем на _ISDIR_TTL_SEC: геттеры зовутся при каждой перерисовке"""
+        now = time.monotonic()
+        cached = self._isdir_cache.get(path)
+        if cached is not None and now - cached[0] < _ISDIR_TTL_SEC:
+            return cached[1]
+        result = os.path.isdir(path)
+        self._isdir_cache[path] = (now, result)
+        return result
 
     def get_last_output_dir(self) -> str | None:
         """
@@ -56,7 +186,7 @@ class UserSettings:
         """
         path = self.settings.get("last_output_dir", "")
         # Проверяем, что путь существует
-        if path and os.path.isdir(path):
+        if path and self._isdir_cached(path):
             return path
         return None
 
@@ -69,6 +199,7 @@ class UserSettings:
         """
         if path and os.path.isdir(path):
             self.settings["last_output_dir"] = path
+            self._isdir_cache.pop(path, None)
             self._save_settings()
 
     def get_last_files_dir(self) -> str | None:
@@ -80,7 +211,7 @@ class UserSettings:
         """
         path = self.settings.get("last_files_dir", "")
         # Проверяем, что путь существует
-        if path and os.path.isdir(path):
+        if path and self._isdir_cached(path):
             return path
         return None
 
@@ -101,6 +232,7 @@ class UserSettings:
                 return
 
             self.settings["last_files_dir"] = path
+            self._isdir_cache.pop(path, None)
             self._save_settings()
 
     def get_value(self, key: str, default=None):
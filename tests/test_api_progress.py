@@ -33,6 +33,7 @@ def test_task_status_includes_progress_metadata_defaults(tmp_path, monkeypatch):
 @pytest.mark.skipif(api.FastAPI is None, reason="FastAPI недоступен")
 def test_process_transcription_persists_progress_metadata_from_events(monkeypatch, tmp_path):
     task_id = "c" * 32
+    monkeypatch.setattr(api, "RESULTS_DIR", tmp_path)
     audio = tmp_path / "audio.mp3"
     audio.write_bytes(b"content")
 
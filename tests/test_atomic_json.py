@@ -37,3 +37,14 @@ def test_overwrite_preserves_validity(tmp_path):
     save_json_atomic(path, {"v": 2})
     with open(path, encoding="utf-8") as f:
         assert json.load(f) == {"v": 2}
+
+
+def test_roundtrip_keeps_stdlib_json_semantics(tmp_path):
+    # Те же файлы пишут мета задач api/web: NaN, int-ключи и длинные int
+    # должны сохраняться так же, как у json.dump
+    path = str(tmp_path / "meta.json")
+    save_json_atomic(path, {"ratio": float("nan"), 1: "один", "size": 2**70})
+    loaded = load_json(path, None)
+    assert loaded["ratio"] != loaded["ratio"]
+    assert loaded["1"] == "один"
+    assert loaded["size"] == 2**70
@@ -28,6 +28,7 @@ def test_find_ffmpeg_falls_back_when_bundled_binary_not_executable(monkeypatch):
 
 
 def test_find_ffprobe_returns_none_when_only_wrong_bundled_binary_exists_on_windows(monkeypatch):
+    monkeypatch.setattr(audio_converter, "_ffprobe_cached", None)
     monkeypatch.setattr(audio_converter, "_project_root", lambda: r"C:\\App")
     monkeypatch.setattr(audio_converter.os, "name", "nt", raising=False)
     monkeypatch.setattr(audio_converter.os.path, "isfile", lambda path: path.endswith("/bin/ffprobe"))
@@ -47,7 +48,7 @@ def test_find_ffmpeg_uses_bundled_binary_on_posix(monkeypatch):
     assert audio_converter._find_ffmpeg() == "/opt/app/bin/ffmpeg"
 
 
-def test_convert_to_wav_reports_monotonic_progress_from_out_time(monkeypatch):
+def test_convert_to_wav_reports_monotonic_progress_from_out_time(monkeypatch, tmp_path):
     progresses: list[float | None] = []
 
     class DummyProcess:
@@ -85,17 +86,15 @@ def test_convert_to_wav_reports_monotonic_progress_from_out_time(monkeypatch):
     def fake_popen(_command, **_kwargs):
         return DummyProcess()
 
-    monkeypatch.setattr(audio_converter.os.path, "exists", lambda _path: True)
-    monkeypatch.setattr(audio_converter.os.path, "isfile", lambda _path: True)
-    monkeypatch.setattr(audio_converter.os.path, "abspath", lambda value: value)
-    monkeypatch.setattr(audio_converter.os.path, "expanduser", lambda value: value)
+    source = tmp_path / "input.mkv"
+    source.write_bytes(b"\x00" * 16)
     monkeypatch.setattr(audio_converter.uuid, "uuid4", lambda: type("UUID", (), {"hex": "unit-test"})())
     monkeypatch.setattr(audio_converter, "_find_ffmpeg", lambda: "ffmpeg")
     monkeypatch.setattr(audio_converter.subprocess, "Popen", fake_popen)
     converter = audio_converter.AudioConverter(logger=lambda *_args, **_kwargs: None)
 
     result = converter.convert_to_wav(
-        "input.mkv",
+        str(source),
         "/tmp",
         progress_callback=lambda value: progresses.append(value),
         media_duration=5.0,
@@ -105,7 +104,7 @@ def test_convert_to_wav_reports_monotonic_progress_from_out_time(monkeypatch):
     assert progresses == [0.2, 0.5, 1.0]
 
 
-def test_convert_to_wav_unknown_duration_keeps_indeterminate(monkeypatch):
+def test_convert_to_wav_unknown_duration_keeps_indeterminate(monkeypatch, tmp_path):
     progresses: list[float | None] = []
 
     class DummyProcess:
@@ -131,16 +130,14 @@ def test_convert_to_wav_unknown_duration_keeps_indeterminate(monkeypatch):
     def fake_popen(_command, **_kwargs):
         return DummyProcess()
 
-    monkeypatch.setattr(audio_converter.os.path, "exists", lambda _path: True)
-    monkeypatch.setattr(audio_converter.os.path, "isfile", lambda _path: True)
-    monkeypatch.setattr(audio_converter.os.path, "abspath", lambda value: value)
-    monkeypatch.setattr(audio_converter.os.path, "expanduser", lambda value: value)
+    source = tmp_path / "input.mkv"
+    source.write_bytes(b"\x00" * 16)
     monkeypatch.setattr(audio_converter.uuid, "uuid4", lambda: type("UUID", (), {"hex": "unit-test"})())
     monkeypatch.setattr(audio_converter, "_find_ffmpeg", lambda: "ffmpeg")
     monkeypatch.setattr(audio_converter.subprocess, "Popen", fake_popen)
     converter = audio_converter.AudioConverter(logger=lambda *_args, **_kwargs: None)
     converter.convert_to_wav(
-        "input.mkv",
+        str(source),
         "/tmp",
         progress_callback=lambda value: progresses.append(value),
         media_duration=None,
@@ -149,7 +146,7 @@ def test_convert_to_wav_unknown_duration_keeps_indeterminate(monkeypatch):
     assert progresses == [None]
 
 
-def test_convert_to_wav_failed_ffmpeg_returns_none_and_logs(monkeypatch):
+def test_convert_to_wav_failed_ffmpeg_returns_none_and_logs(monkeypatch, tmp_path):
     logged: list[str] = []
 
     class DummyProcess:
@@ -175,10 +172,8 @@ def test_convert_to_wav_failed_ffmpeg_returns_none_and_logs(monkeypatch):
     def fake_popen(_command, **_kwargs):
         return DummyProcess()
 
-    monkeypatch.setattr(audio_converter.os.path, "exists", lambda _path: True)
-    monkeypatch.setattr(audio_converter.os.path, "isfile", lambda _path: True)
-    monkeypatch.setattr(audio_converter.os.path, "abspath", lambda value: value)
-    monkeypatch.setattr(audio_converter.os.path, "expanduser", lambda value: value)
+    source = tmp_path / "input.mkv"
+    source.write_bytes(b"\x00" * 16)
     monkeypatch.setattr(audio_converter.uuid, "uuid4", lambda: type("UUID", (), {"hex": "unit-test"})())
     def logger(*args):
         logged.append(" ".join(str(x) for x in args))
@@ -186,6 +181,135 @@ def test_convert_to_wav_failed_ffmpeg_returns_none_and_logs(monkeypatch):
     monkeypatch.setattr(audio_converter, "_find_ffmpeg", lambda: "ffmpeg")
     monkeypatch.setattr(audio_converter.subprocess, "Popen", fake_popen)
     converter = audio_converter.AudioConverter(logger=logger)
-    converter.convert_to_wav("input.mkv", "/tmp")
+    converter.convert_to_wav(str(source), "/tmp")
 
     assert any("Ошибка FFmpeg" in line for line in logged)
+    assert any("Команда: ffmpeg " in line and "input.mkv" in line for line in logged)
+    # Отладочные строки пишутся только при debug=True
+    assert not any(line.startswith("DEBUG:") for line in logged)
+
+
+def test_media_duration_fallback_parses_ffmpeg_stderr_bytes(monkeypatch):
+    captured = {}
+
+    def fake_run(command, **kwargs):
+        captured.update(kwargs)
+        stderr = b"Input #0, mov\n  Duration: 01:02:03.50, start: 0.000000\nsize=N/A\n"
+        return type("Result", (), {"returncode": 0, "stderr": stderr})()
+
+    monkeypatch.setattr(audio_converter, "_find_ffprobe", lambda: None)
+    monkeypatch.setattr(audio_converter, "_find_ffmpeg", lambda: "ffmpeg")
+    monkeypatch.setattr(audio_converter.subprocess, "run", fake_run)
+
+    assert audio_converter.AudioConverter.get_media_duration("input.mp4") == 3723.5
+    assert "text" not in captured
+
+
+def test_convert_to_wav_returns_model_ready_wav_without_ffmpeg(monkeypatch, tmp_path):
+    import numpy as np
+    import soundfile as sf
+
+    source = tmp_path / "ready.wav"
+    sf.write(source, np.zeros(1600, dtype=np.int16), audio_converter.AUDIO_SAMPLE_RATE, subtype="PCM_16")
+
+    def fail_popen(*_args, **_kwargs):
+        raise AssertionError("ffmpeg не должен запускаться")
+
+    monkeypatch.setattr(audio_converter.subprocess, "Popen", fail_popen)
+    converter = audio_converter.AudioConverter(logger=lambda *_args, **_kwargs: None)
+
+    assert converter.convert_to_wav(str(source), str(tmp_path)) == str(source)
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["ready.wav"]
+
+
+def test_model_ready_wav_check_rejects_other_sample_rates(tmp_path):
+    import numpy as np
+    import soundfile as sf
+
+    stereo = tmp_path / "stereo.wav"
+    sf.write(stereo, np.zeros((1600, 2), dtype=np.int16), audio_converter.AUDIO_SAMPLE_RATE, subtype="PCM_16")
+    resampled = tmp_path / "44k.wav"
+    sf.write(resampled, np.zeros(1600, dtype=np.int16), 44100, subtype="PCM_16")
+    floats = tmp_path / "float.wav"
+    sf.write(floats, np.zeros(1600, dtype=np.float32), audio_converter.AUDIO_SAMPLE_RATE, subtype="FLOAT")
+
+    assert not audio_converter._is_model_ready_wav(str(stereo))
+    assert not audio_converter._is_model_ready_wav(str(resampled))
+    assert not audio_converter._is_model_ready_wav(str(floats))
+
+
+def test_media_duration_parses_ffprobe_json_bytes(monkeypatch):
+    captured = {}
+
+    def fake_run(command, **kwargs):
+        captured.update(kwargs)
+        stdout = b'{"format": {"duration": "12.500000"}}'
+        return type("Result", (), {"returncode": 0, "stdout": stdout})()
+
+    monkeypatch.setattr(audio_converter, "_find_ffprobe", lambda: "ffprobe")
+    monkeypatch.setattr(audio_converter.subprocess, "run", fake_run)
+
+    assert audio_converter.AudioConverter.get_media_duration("input.mp4") == 12.5
+    assert "text" not in captured
+
+
+def test_find_ffprobe_probes_candidates_once(monkeypatch):
+    probes = []
+    monkeypatch.setattr(audio_converter, "_ffprobe_cached", None)
+    monkeypatch.setattr(audio_converter, "_find_bundled_tool", lambda name: None)
+    monkeypatch.setattr(audio_converter.shutil, "which", lambda name: "/usr/bin/ffprobe")
+    monkeypatch.setattr(audio_converter, "_tool_executable", lambda path: probes.append(path) or True)
+
+    assert audio_converter._find_ffprobe() == "/usr/bin/ffprobe"
+    assert audio_converter._find_ffprobe() == "/usr/bin/ffprobe"
+    assert probes == ["/usr/bin/ffprobe"]
+
+
+def test_find_ffprobe_retries_after_a_miss(monkeypatch):
+    found = []
+    monkeypatch.setattr(audio_converter, "_ffprobe_cached", None)
+    monkeypatch.setattr(audio_converter, "_find_bundled_tool", lambda name: None)
+    monkeypatch.setattr(audio_converter.shutil, "which", lambda name: found[0] if found else None)
+    monkeypatch.setattr(audio_converter, "_tool_executable", lambda path: True)
+
+    assert audio_converter._find_ffprobe() is None
+    found.append("/usr/bin/ffprobe")  # ffprobe поставили, не перезапуская приложение
+    assert audio_converter._find_ffprobe() == "/usr/bin/ffprobe"
+
+
+def test_convert_debug_details_go_to_logging_unless_debug_enabled(monkeypatch, tmp_path, caplog):
+    class DummyPipe:
+        def readline(self):
+            return ""
+
+    class DummyProcess:
+        stdout = DummyPipe()
+        stderr = DummyPipe()
+
+        def wait(self):
+            return 0
+
+    source = tmp_path / "input.mkv"
+    source.write_bytes(b"\x00" * 16)
+    monkeypatch.setattr(audio_converter, "_find_ffmpeg", lambda: "/usr/bin/ffmpeg")
+    monkeypatch.setattr(audio_converter.subprocess, "Popen", lambda *_args, **_kwargs: DummyProcess())
+
+    gui_lines: list[str] = []
+    with caplog.at_level("DEBUG", logger=audio_converter.__name__):
+        audio_converter.AudioConverter(logger=gui_lines.append).convert_to_wav(str(source), str(tmp_path))
+    assert not any(line.startswith("DEBUG:") for line in gui_lines)
+    assert any("Команда FFmpeg: /usr/bin/ffmpeg" in record.getMessage() for record in caplog.records)
+
+    gui_lines.clear()
+    audio_converter.AudioConverter(logger=gui_lines.append, debug=True).convert_to_wav(str(source), str(tmp_path))
+    assert any(line.startswith("DEBUG: Команда FFmpeg: /usr/bin/ffmpeg") for line in gui_lines)
+
+
+def test_convert_to_wav_rejects_missing_and_directory_inputs(tmp_path):
+    logged: list[str] = []
+    converter = audio_converter.AudioConverter(logger=logged.append)
+
+    assert converter.convert_to_wav(str(tmp_path / "missing.mp4"), str(tmp_path)) is None
+    assert converter.convert_to_wav(str(tmp_path), str(tmp_path)) is None
+    assert any("Файл не найден" in line for line in logged)
+    assert any("не является файлом" in line for line in logged)
@@ -75,3 +75,104 @@ def test_convert_times_out_instead_of_hanging(monkeypatch, tmp_path):
     out = conv.convert_to_wav(str(src), str(tmp_path), media_duration=0.0)
 
     assert out is None  # watchdog убил зависший ffmpeg, а не завис навсегда
+
+
+def test_convert_is_killed_by_cancel_event(monkeypatch, tmp_path):
+    monkeypatch.setattr(audio_converter, "_find_ffmpeg", lambda: "ffmpeg")
+    monkeypatch.setattr(audio_converter.subprocess, "Popen", lambda cmd, **k: _HangingProc())
+
+    src = tmp_path / "in.mp4"
+    src.write_bytes(b"\x00" * 16)
+    cancel = Event()
+    cancel.set()
+    messages = []
+    conv = audio_converter.AudioConverter(logger=messages.append)
+    out = conv.convert_to_wav(str(src), str(tmp_path), media_duration=10.0, cancel_event=cancel)
+
+    assert out is None  # отмена, а не ожидание _CONVERSION_STALL_TIMEOUT
+    assert messages[-1] == "Конвертация in.mp4 отменена."
+    assert [p.name for p in tmp_path.iterdir()] == ["in.mp4"]
+
+
+def test_convert_suppresses_ffmpeg_log_spam(monkeypatch, tmp_path):
+    captured = {}
+
+    def fake_popen(cmd, **kwargs):
+        captured["cmd"] = cmd
+        return _CleanProc()
+
+    monkeypatch.setattr(audio_converter, "_find_ffmpeg", lambda: "ffmpeg")
+    monkeypatch.setattr(audio_converter.subprocess, "Popen", fake_popen)
+
+    src = tmp_path / "in.mp4"
+    src.write_bytes(b"\x00" * 16)
+    conv = audio_converter.AudioConverter(logger=lambda *a, **k: None)
+    assert conv.convert_to_wav(str(src), str(tmp_path), media_duration=10.0) is not None
+
+    cmd = captured["cmd"]
+    assert cmd[cmd.index("-loglevel") + 1] == "error"
+    assert "-nostats" in cmd
+
+
+def test_convert_passes_dash_prefixed_relative_input_as_absolute_path(monkeypatch, tmp_path):
+    captured = {}
+
+    def fake_popen(cmd, **kwargs):
+        captured["cmd"] = cmd
+        return _CleanProc()
+
+    monkeypatch.setattr(audio_converter, "_find_ffmpeg", lambda: "ffmpeg")
+    monkeypatch.setattr(audio_converter.subprocess, "Popen", fake_popen)
+    monkeypatch.chdir(tmp_path)
+
+    (tmp_path / "-in.mp3").write_bytes(b"\x00" * 16)
+    conv = audio_converter.AudioConverter(logger=lambda *a, **k: None)
+    assert conv.convert_to_wav("-in.mp3", str(tmp_path), media_duration=10.0) is not None
+
+    cmd = captured["cmd"]
+    assert cmd[cmd.index("-i") + 1] == str(tmp_path / "-in.mp3")
+
+
+def test_convert_maps_first_audio_stream_to_pcm_wav(monkeypatch, tmp_path):
+    captured = {}
+
+    def fake_popen(cmd, **kwargs):
+        captured["cmd"] = cmd
+        return _CleanProc()
+
+    monkeypatch.setattr(audio_converter, "_find_ffmpeg", lambda: "ffmpeg")
+    monkeypatch.setattr(audio_converter.subprocess, "Popen", fake_popen)
+
+    src = tmp_path / "in.mkv"
+    src.write_bytes(b"\x00" * 16)
+    conv = audio_converter.AudioConverter(logger=lambda *a, **k: None)
+    assert conv.convert_to_wav(str(src), str(tmp_path), media_duration=10.0) is not None
+
+    cmd = captured["cmd"]
+    # -threads до -i — это опция декодера, а не кодера
+    assert cmd.index("-threads") < cmd.index("-i")
+    assert cmd[cmd.index("-map") + 1] == "0:a:0"
+    assert {"-vn", "-sn", "-dn"} <= set(cmd)
+    assert cmd[cmd.index("-c:a") + 1] == "pcm_s16le"
+    assert cmd[cmd.index("-f") + 1] == "wav"
+
+
+def test_convert_keeps_posix_spawn_fast_path(monkeypatch, tmp_path):
+    captured = {}
+
+    def fake_popen(cmd, **kwargs):
+        captured.update(kwargs)
+        return _CleanProc()
+
+    monkeypatch.setattr(audio_converter, "_find_ffmpeg", lambda: "/usr/bin/ffmpeg")
+    monkeypatch.setattr(audio_converter.subprocess, "Popen", fake_popen)
+
+    src = tmp_path / "in.mp4"
+    src.write_bytes(b"\x00" * 16)
+    conv = audio_converter.AudioConverter(logger=lambda *a, **k: None)
+    assert conv.convert_to_wav(str(src), str(tmp_path), media_duration=10.0) is not None
+
+    if audio_converter.os.name != "nt":
+        assert captured["close_fds"] is False
+    for key in ("preexec_fn", "pass_fds", "shell", "cwd", "start_new_session"):
+        assert not captured.get(key)
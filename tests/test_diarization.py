@@ -61,3 +61,296 @@ def test_diarization_manager_runs_without_hook_when_unsupported():
     manager._run_pipeline("/tmp/audio.wav", {"min_speakers": 1}, lambda *args: called.append(args))
 
     assert called == []
+
+
+def test_diarization_manager_preloads_mono_waveform(tmp_path):
+    import numpy as np
+    import pytest
+    import soundfile as sf
+
+    pytest.importorskip("torch")
+    path = tmp_path / "stereo.wav"
+    sf.write(path, np.stack([np.full(1600, 0.5), np.full(1600, -0.5)], axis=1), 16000, subtype="FLOAT")
+    manager = DiarizationManager(hf_token="hf_dummy", device="cpu")
+
+    audio = manager._load_waveform(path)
+
+    assert audio["sample_rate"] == 16000
+    assert tuple(audio["waveform"].shape) == (1, 1600)
+    assert float(audio["waveform"].abs().max()) == 0.0
+
+
+def test_embedding_autocast_skips_models_without_resnet():
+    from types import SimpleNamespace
+
+    from src.utils.diarization import _autocast_embedding_resnet
+
+    assert _autocast_embedding_resnet(None, "cuda") is False
+    assert _autocast_embedding_resnet(SimpleNamespace(model_=object()), "cuda") is False
+
+
+def test_embedding_autocast_keeps_fbank_finite_at_full_amplitude():
+    from types import SimpleNamespace
+
+    import pytest
+
+    from src.utils.diarization import _autocast_embedding_resnet
+
+    torch = pytest.importorskip("torch")
+    kaldi = pytest.importorskip("torchaudio.compliance.kaldi")
+    device = "cuda" if torch.cuda.is_available() else "cpu"
+
+    class ResNet(torch.nn.Module):
+        def __init__(self):
+            super().__init__()
+            self.seg_1 = torch.nn.Linear(80, 16)
+
+        def forward(self, features, weights=None):
+            return torch.tensor(0.0), self.seg_1(features.mean(dim=1))
+
+    class WeSpeakerModel(torch.nn.Module):
+        """Как WeSpeakerResNet34 в pyannote 3.1: kaldi fbank, затем ResNet."""
+
+        def __init__(self):
+            super().__init__()
+            self.resnet = ResNet()
+
+        def compute_fbank(self, waveforms):
+            waveforms = waveforms * (1 << 15)
+            return torch.stack([
+                kaldi.fbank(
+                    waveform,
+                    num_mel_bins=80,
+                    frame_length=25,
+                    frame_shift=10,
+                    dither=0.0,
+                    sample_frequency=16000,
+                    window_type="hamming",
+                    use_energy=False,
+                )
+                for waveform in waveforms
+            ])
+
+        def forward(self, waveforms, weights=None):
+            return self.resnet(self.compute_fbank(waveforms), weights=weights)[1]
+
+    model = WeSpeakerModel().to(device)
+    assert _autocast_embedding_resnet(SimpleNamespace(model_=model), device) is True
+
+    # Меандр на полной амплитуде: спектр мощности после *2^15 далеко за пределами fp16
+    samples = torch.arange(16000, device=device)
+    waveforms = torch.where(samples // 20 % 2 == 0, 1.0, -1.0).reshape(1, 1, -1)
+    with torch.inference_mode():
+        embeddings = model(waveforms)
+
+    assert embeddings.dtype == torch.float32
+    assert bool(torch.isfinite(embeddings).all())
+
+
+def test_diarization_manager_rejects_unknown_embedding_precision():
+    import pytest
+
+    with pytest.raises(ValueError):
+        DiarizationManager(hf_token="hf_dummy", device="cpu", embedding_precision="int8")
+
+
+def test_diarization_managers_share_loaded_pipeline(monkeypatch):
+    loads = []
+    monkeypatch.setattr(DiarizationManager, "_shared_pipelines", {})
+    monkeypatch.setattr(DiarizationManager, "_load_pipeline", lambda self: loads.append(self) or object())
+
+    first = DiarizationManager(hf_token="hf_dummy", device="cpu")
+    second = DiarizationManager(hf_token="hf_dummy", device="cpu")
+    other_device = DiarizationManager(hf_token="hf_dummy", device="cuda")
+
+    assert first.pipeline is second.pipeline
+    assert other_device.pipeline is not first.pipeline
+    assert len(loads) == 2
+
+
+def test_unload_frees_shared_pipeline_after_last_user(monkeypatch):
+    monkeypatch.setattr(DiarizationManager, "_shared_pipelines", {})
+    monkeypatch.setattr(DiarizationManager, "_load_pipeline", lambda self: object())
+
+    first = DiarizationManager(hf_token="hf_dummy", device="cpu")
+    second = DiarizationManager(hf_token="hf_dummy", device="cpu")
+    pipeline = first.pipeline
+    assert second.pipeline is pipeline
+
+    first.unload()
+    assert list(DiarizationManager._shared_pipelines.values()) == [pipeline]
+    second.unload()
+    assert DiarizationManager._shared_pipelines == {}
+
+
+def test_shared_cache_evicts_unused_pipeline_of_the_device(monkeypatch):
+    monkeypatch.setattr(DiarizationManager, "_shared_pipelines", {})
+    monkeypatch.setattr(DiarizationManager, "_shared_inference_locks", {})
+    monkeypatch.setattr(DiarizationManager, "_load_pipeline", lambda self: object())
+
+    first = DiarizationManager(hf_token="hf_first", device="cpu").pipeline
+    latest = DiarizationManager(hf_token="hf_second", device="cpu").pipeline
+
+    assert latest is not first
+    assert list(DiarizationManager._shared_pipelines.values()) == [latest]
+    assert len(DiarizationManager._shared_inference_locks) == 1
+
+
+def test_shared_cache_keeps_pipeline_held_by_live_manager(monkeypatch):
+    monkeypatch.setattr(DiarizationManager, "_shared_pipelines", {})
+    monkeypatch.setattr(DiarizationManager, "_shared_inference_locks", {})
+    loads = []
+
+    def load(self):
+        loads.append(self.hf_token)
+        return object()
+
+    monkeypatch.setattr(DiarizationManager, "_load_pipeline", load)
+
+    first = DiarizationManager(hf_token="hf_first", device="cpu")
+    second = DiarizationManager(hf_token="hf_second", device="cpu")
+    for _ in range(2):
+        assert first.pipeline is not second.pipeline
+        first._pipeline = second._pipeline = None
+
+    assert loads == ["hf_first", "hf_second"]
+    assert len(DiarizationManager._shared_pipelines) == 2
+
+
+def test_shared_pipeline_calls_are_serialized(monkeypatch):
+    import threading
+    import time
+
+    monkeypatch.setattr(DiarizationManager, "_shared_pipelines", {})
+    monkeypatch.setattr(DiarizationManager, "_shared_inference_locks", {})
+    monkeypatch.setattr(DiarizationManager, "_load_pipeline", lambda self: object())
+    active = []
+    overlaps = []
+
+    def call_pipeline(self, pipeline, audio, kwargs, progress_callback):
+        active.append(audio)
+        overlaps.append(len(active))
+        time.sleep(0.02)
+        active.remove(audio)
+
+    monkeypatch.setattr(DiarizationManager, "_call_pipeline", call_pipeline)
+    managers = [DiarizationManager(hf_token="hf_dummy", device="cpu") for _ in range(3)]
+    threads = [
+        threading.Thread(target=manager._run_pipeline, args=(f"{i}.wav", {}))
+        for i, manager in enumerate(managers)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert overlaps == [1, 1, 1]
+
+
+def test_pipeline_warning_filter_is_scoped_to_the_pipeline_call(monkeypatch):
+    import warnings
+
+    def noisy_pipeline(self, pipeline, audio, kwargs, progress_callback):
+        warnings.warn_explicit("шум", UserWarning, "io.py", 1, module="pyannote.audio.core.io")
+        warnings.warn_explicit("важно", UserWarning, "app.py", 1, module="src.gui.app_qt")
+        return "diarization"
+
+    monkeypatch.setattr(DiarizationManager, "_call_pipeline", noisy_pipeline)
+    manager = DiarizationManager(hf_token="hf_dummy", device="cpu")
+    manager._pipeline = object()
+
+    with warnings.catch_warnings(record=True) as caught:
+        warnings.simplefilter("always")
+        filters_before = list(warnings.filters)
+        assert manager._run_pipeline("a.wav", {}) == "diarization"
+        assert warnings.filters == filters_before
+        warnings.warn_explicit("после", UserWarning, "io.py", 1, module="pyannote.audio.core.io")
+
+    assert [str(w.message) for w in caught] == ["важно", "после"]
+
+
+def test_pipeline_runs_under_inference_mode():
+    import pytest
+
+    torch = pytest.importorskip("torch")
+
+    seen = []
+
+    class _Pipeline:
+        def __call__(self, audio, **_kwargs):
+            seen.append(torch.is_inference_mode_enabled())
+            return _FakeResult()
+
+    manager = DiarizationManager(hf_token="hf_dummy", device="cpu")
+    manager._pipeline = _Pipeline()
+    manager._run_pipeline("audio.wav", {})
+
+    assert seen == [True]
+
+
+def test_tune_pipeline_coarsens_segmentation_step():
+    from types import SimpleNamespace
+
+    segmentation = SimpleNamespace(duration=10.0, step=1.0, batch_size=1)
+    pipeline = SimpleNamespace(_segmentation=segmentation, segmentation_step=0.1, embedding_batch_size=32)
+    manager = DiarizationManager(hf_token="hf_dummy", device="cpu")
+
+    manager._tune_pipeline(pipeline)
+
+    assert pipeline.segmentation_step == 0.5
+    assert segmentation.step == 5.0
+    assert segmentation.batch_size == 32
+
+
+def test_tune_pipeline_keeps_pyannote_defaults_when_disabled():
+    from types import SimpleNamespace
+
+    segmentation = SimpleNamespace(duration=10.0, step=1.0, batch_size=1)
+    pipeline = SimpleNamespace(_segmentation=segmentation, segmentation_step=0.1)
+    manager = DiarizationManager(
+        hf_token="hf_dummy",
+        device="cpu",
+        segmentation_step=None,
+        segmentation_batch_size=None,
+    )
+
+    manager._tune_pipeline(pipeline)
+
+    assert (pipeline.segmentation_step, segmentation.step, segmentation.batch_size) == (0.1, 1.0, 1)
+
+
+def test_embedding_batch_size_is_raised_only_on_cuda():
+    from types import SimpleNamespace
+
+    cpu_pipeline = SimpleNamespace(embedding_batch_size=32)
+    cuda_pipeline = SimpleNamespace(embedding_batch_size=32)
+
+    DiarizationManager(hf_token="hf_dummy", device="cpu")._tune_pipeline(cpu_pipeline)
+    DiarizationManager(hf_token="hf_dummy", device="cuda")._tune_pipeline(cuda_pipeline)
+
+    assert cpu_pipeline.embedding_batch_size == 32
+    assert cuda_pipeline.embedding_batch_size == 128
+
+
+def test_cuda_embedding_settings_follow_detected_vram(monkeypatch):
+    import sys
+    from types import SimpleNamespace
+
+    from src.utils import diarization
+
+    def fake_torch(total_gb, major):
+        properties = SimpleNamespace(total_memory=total_gb * 1e9, major=major)
+        cuda = SimpleNamespace(current_device=lambda: 0, get_device_properties=lambda _index: properties)
+        return SimpleNamespace(cuda=cuda)
+
+    monkeypatch.setitem(sys.modules, "torch", fake_torch(4, 8))
+    small = DiarizationManager(hf_token="hf_dummy", device="cuda")
+    monkeypatch.setitem(sys.modules, "torch", fake_torch(8, 6))
+    old_arch = DiarizationManager(hf_token="hf_dummy", device="cuda")
+    monkeypatch.setitem(sys.modules, "torch", fake_torch(24, 8))
+    large = DiarizationManager(hf_token="hf_dummy", device="cuda", embedding_batch_size=96)
+
+    assert (small.embedding_batch_size, small.embedding_precision) == (32, "float32")
+    assert (old_arch.embedding_batch_size, old_arch.embedding_precision) == (64, "float32")
+    assert (large.embedding_batch_size, large.embedding_precision) == (96, "float16")
+    assert diarization._cuda_embedding_profile() == (128, True)
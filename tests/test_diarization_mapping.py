@@ -315,3 +315,94 @@ def test_real_speaker_turn_survives_smoothing(make_manager):
     mapped = mgr.map_speakers_to_transcription(trans, speaker_segs)
 
     assert [seg["speaker"] for seg in mapped] == ["A", "B", "A"]
+
+
+def test_indexed_speaker_lookup_matches_full_scan_with_overlaps():
+    import random
+
+    from src.core.diarization.mapping import SpeakerMappingMixin, _SpeakerIndex
+
+    rng = random.Random(7)
+    segs = []
+    for i in range(200):
+        start = rng.uniform(0.0, 600.0)
+        segs.append(SpeakerSegment(start, start + rng.uniform(0.05, 30.0), f"S{i % 5}"))
+    segs.sort(key=lambda seg: seg.start)
+    index = _SpeakerIndex(segs)
+
+    for _ in range(500):
+        start = rng.uniform(-5.0, 640.0)
+        end = start + rng.uniform(0.01, 3.0)
+        mid = (start + end) / 2
+        assert SpeakerMappingMixin._find_speaker_by_overlap(start, end, index) == \
+            SpeakerMappingMixin._find_speaker_by_overlap(start, end, segs)
+        assert SpeakerMappingMixin._find_speaker_at_time(mid, index) == \
+            SpeakerMappingMixin._find_speaker_at_time(mid, segs)
+        assert SpeakerMappingMixin._find_nearest_speaker(start, end, index) == \
+            SpeakerMappingMixin._find_nearest_speaker(start, end, segs)
+
+
+def test_vectorized_overlap_keeps_first_best_segment():
+    from src.core.diarization.mapping import _VECTORIZE_MIN_SEGMENTS, SpeakerMappingMixin, _SpeakerIndex
+
+    # Плотное перекрытие: окно больше порога, считается через numpy.
+    segs = [SpeakerSegment(float(i) * 0.01, 50.0, f"S{i}") for i in range(_VECTORIZE_MIN_SEGMENTS * 2)]
+    segs.append(SpeakerSegment(0.0, 50.0, "TIE"))
+    index = _SpeakerIndex(segs)
+
+    assert SpeakerMappingMixin._find_speaker_by_overlap(10.0, 12.0, index) == "S0"
+    assert SpeakerMappingMixin._find_speaker_by_overlap(10.0, 12.0, segs) == "S0"
+    assert SpeakerMappingMixin._find_speaker_by_overlap(60.0, 61.0, index) is None
+
+
+def test_find_speaker_at_time_bisects_index_like_list_scan():
+    from src.core.diarization.mapping import _SpeakerIndex
+
+    mgr = _mgr()
+    segs = [SpeakerSegment(0.0, 2.0, "A"), SpeakerSegment(2.0, 4.0, "B"), SpeakerSegment(1.0, 9.0, "C")]
+    index = _SpeakerIndex(segs)
+
+    for time, expected in ((2.0, "A"), (3.0, "C"), (8.0, "C"), (9.5, None), (-1.0, None)):
+        assert mgr._find_speaker_at_time(time, index) == expected
+
+
+def test_speaker_timeline_roundtrip_and_mapping_matches_segment_list():
+    from src.core.diarization import SpeakerTimeline
+
+    segs = [
+        SpeakerSegment(5.0, 7.0, "B"),
+        SpeakerSegment(0.0, 3.0, "A"),
+        SpeakerSegment(0.0, 1.0, "C"),
+        SpeakerSegment(3.0, 5.0, "A"),
+    ]
+    timeline = SpeakerTimeline.from_segments(segs)
+
+    # Коды — в порядке первого появления метки, сортировка по началу устойчивая
+    assert timeline.labels == ("B", "A", "C")
+    assert timeline.codes.tolist() == [1, 2, 1, 0]
+    assert list(timeline) == sorted(segs, key=lambda s: s.start)
+
+    transcription = [
+        {"boundaries": (0.5, 2.5), "transcription": "раз"},
+        {"boundaries": (5.5, 6.5), "transcription": "два"},
+    ]
+    mgr = _mgr()
+    assert mgr.map_speakers_to_transcription(transcription, timeline) == (
+        mgr.map_speakers_to_transcription(transcription, segs)
+    )
+
+
+def test_speaker_timeline_keeps_int16_codes_in_first_appearance_order():
+    from src.core.diarization import SpeakerTimeline
+
+    segs = [
+        SpeakerSegment(4.0, 5.0, "SPEAKER_00"),
+        SpeakerSegment(0.0, 1.0, "SPEAKER_02"),
+        SpeakerSegment(2.0, 3.0, "SPEAKER_00"),
+        SpeakerSegment(6.0, 7.0, "SPEAKER_01"),
+    ]
+    timeline = SpeakerTimeline.from_segments(segs)
+
+    assert timeline.codes.dtype.itemsize == 2
+    assert timeline.labels == ("SPEAKER_00", "SPEAKER_02", "SPEAKER_01")
+    assert list(timeline) == sorted(segs, key=lambda s: s.start)
@@ -2,6 +2,7 @@ import os
 import re
 import sys
 import threading
+import time
 import types
 from pathlib import Path
 
@@ -37,17 +38,6 @@ def _autoclose(window, monkeypatch):
     window.close()
 
 
-def test_file_progress_still_accepts_integer():
-    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
-    app = QApplication.instance() or QApplication([])
-    window = GigaTranscriberQtApp()
-
-    window._update_file_progress(50)
-
-    assert window.progress_bar_file.value() == 50
-    window.close()
-
-
 def test_llm_progress_updates_bar():
     app = QApplication.instance() or QApplication([])
     window = GigaTranscriberQtApp()
@@ -689,3 +679,50 @@ def test_geometry_not_persisted_in_headless():
     window._save_geometry()
     assert "window_geometry" not in window.user_settings.settings
     window.close()
+
+
+def test_file_progress_emits_are_coalesced_within_stage(monkeypatch):
+    from src.core.progress import ProgressEvent
+
+    app = QApplication.instance() or QApplication([])
+    window = GigaTranscriberQtApp()
+    emitted = []
+    monkeypatch.setattr(window.signals, "stage_update", types.SimpleNamespace(emit=emitted.append))
+    window._reset_file_progress_throttle()
+
+    for step in range(1, 11):
+        window._on_file_progress(ProgressEvent(stage="transcription", stage_progress=step / 10, file_progress=step / 10))
+    window._on_file_progress(ProgressEvent(stage="export", stage_progress=0.0, file_progress=0.95))
+    window._on_file_progress(ProgressEvent(stage="export", stage_progress=1.0, file_progress=1.0))
+
+    # Первое событие и смена стадии уходят сразу, промежуточные — придерживаются,
+    # а финал прежней стадии досылается перед первым событием новой.
+    assert [event["stage"] for event in emitted] == ["transcription", "transcription", "export"]
+    assert emitted[1]["file_progress"] == 1.0
+
+    window._flush_file_progress()
+    assert emitted[-1]["file_progress"] == 1.0
+    window._flush_file_progress()
+    assert len(emitted) == 4
+    window.close()
+
+
+def test_held_file_progress_is_flushed_by_timer():
+    from src.core.progress import ProgressEvent
+
+    app = QApplication.instance() or QApplication([])
+    window = GigaTranscriberQtApp()
+    window._reset_file_progress_throttle()
+
+    window._on_file_progress(ProgressEvent(stage="transcription", stage_progress=0.1, file_progress=0.1))
+    window._on_file_progress(ProgressEvent(stage="transcription", stage_progress=0.4, file_progress=0.4))
+    assert window.current_stage_file_progress == 0.1
+
+    # Новых событий нет, но придержанное значение доходит до GUI по таймеру
+    deadline = time.monotonic() + 2.0
+    while window.current_stage_file_progress != 0.4 and time.monotonic() < deadline:
+        app.processEvents()
+        time.sleep(0.01)
+
+    assert window.current_stage_file_progress == 0.4
+    window.close()
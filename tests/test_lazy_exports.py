@@ -0,0 +1,26 @@
+"""Тесты ленивых экспортов пакетов (PEP 562)."""
+
+import sys
+
+import pytest
+
+import src.utils as utils_package
+
+
+def test_lazy_exports_are_immutable_and_cached():
+    assert isinstance(utils_package.__all__, tuple)
+    assert "TimeFormatter" in utils_package.__all__
+
+    value = utils_package.TimeFormatter
+
+    assert vars(utils_package)["TimeFormatter"] is value
+    assert value is sys.modules["src.utils.time_formatter"].TimeFormatter
+
+
+def test_unknown_attribute_raises_attribute_error():
+    with pytest.raises(AttributeError, match="no attribute 'missing'"):
+        _ = utils_package.missing
+
+
+def test_dir_lists_exports_before_first_access():
+    assert set(utils_package.__all__) <= set(dir(utils_package))
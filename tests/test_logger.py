@@ -0,0 +1,56 @@
+"""Тесты файлового логирования сессии."""
+
+import logging
+
+from src.utils.logger import AppLogger
+
+
+def _close_gigaam_handlers():
+    logger = logging.getLogger("GigaAM")
+    for handler in logger.handlers[:]:
+        handler.close()
+        logger.removeHandler(handler)
+
+
+def test_queued_records_reach_files_with_handler_levels(tmp_path):
+    app_logger = AppLogger(base_dir=str(tmp_path))
+    try:
+        logger = app_logger.get_logger()
+        logger.debug("отладка")
+        logger.warning("предупреждение")
+        app_logger.log_session_end()
+        # После остановки слушателя запись идёт синхронно, а не теряется
+        logger.error("после завершения")
+
+        main_log = app_logger.main_log.read_text(encoding="utf-8")
+        errors_log = app_logger.errors_log.read_text(encoding="utf-8")
+    finally:
+        _close_gigaam_handlers()
+
+    assert "отладка" in main_log and "Сессия завершена" in main_log
+    assert "после завершения" in main_log
+    assert "предупреждение" in errors_log and "после завершения" in errors_log
+    assert "отладка" not in errors_log
+
+
+def test_logger_adapter_skips_levels_below_threshold():
+    from src.utils.logger import LoggerAdapter
+
+    logger = logging.getLogger("GigaAM.test_adapter")
+    logger.setLevel(logging.INFO)
+    records = []
+    handler = logging.Handler()
+    handler.emit = records.append
+    logger.addHandler(handler)
+    shown = []
+    try:
+        adapter = LoggerAdapter(logger, gui_callback=shown.append, gui_level=logging.WARNING)
+        adapter.debug("не пишется")
+        adapter.info("только в лог")
+        adapter.error("везде")
+    finally:
+        logger.removeHandler(handler)
+
+    assert [record.getMessage() for record in records] == ["только в лог", "везде"]
+    assert shown == ["везде"]
+    assert not adapter.isEnabledFor(logging.DEBUG)
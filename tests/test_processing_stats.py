@@ -28,3 +28,71 @@ def test_estimate_uses_history(tmp_path):
                             conversion_time=10.0, transcription_time=40.0, success=True)
     est = s.estimate_processing_time("b.mp3", media_duration=100.0)
     assert est > 0
+
+
+def test_records_append_to_jsonl_history(tmp_path):
+    import json
+
+    f = tmp_path / "stats.json"
+    s = ProcessingStats(stats_file=str(f))
+    for name in ("a.mp3", "b.mp3", "c.wav"):
+        s.add_processing_record(name, 1024 * 1024, duration=60.0,
+                                conversion_time=5.0, transcription_time=25.0, success=True)
+    s.flush()
+
+    history = (tmp_path / "stats.history.jsonl").read_text(encoding="utf-8").splitlines()
+    assert [json.loads(line)["file_name"] for line in history] == ["a.mp3", "b.mp3", "c.wav"]
+    saved = json.loads(f.read_text(encoding="utf-8"))
+    assert "history" not in saved
+    assert saved["summary"][".mp3"]["count"] == 2
+
+
+def test_legacy_history_is_migrated_and_torn_line_ignored(tmp_path):
+    import json
+
+    f = tmp_path / "stats.json"
+    legacy = ProcessingStats(stats_file=str(tmp_path / "legacy_src.json"))
+    legacy.add_processing_record("a.mp3", 1024 * 1024, duration=100.0,
+                                 conversion_time=10.0, transcription_time=40.0, success=True)
+    f.write_text(json.dumps({"history": legacy.stats["history"], "summary": {}}), encoding="utf-8")
+
+    migrated = ProcessingStats(stats_file=str(f))
+    assert migrated.stats["summary"] == legacy.stats["summary"]
+
+    with open(tmp_path / "stats.history.jsonl", "a", encoding="utf-8") as history:
+        history.write('{"file_name": "обрыв')
+    reloaded = ProcessingStats(stats_file=str(f))
+    assert len(reloaded.stats["history"]) == 1
+    assert reloaded.stats["summary"][".mp3"]["processing_ratio"] == 0.5
+
+
+def test_summary_rebuilt_on_load_matches_incremental_summary(tmp_path):
+    import random
+
+    rng = random.Random(3)
+    f = str(tmp_path / "stats.json")
+    s = ProcessingStats(stats_file=f)
+    for index in range(60):
+        ext = rng.choice([".wav", ".mp3", ".mkv"])
+        s.add_processing_record(f"f{index}{ext}", rng.randint(1, 10**8), duration=rng.uniform(1, 3600),
+                                conversion_time=rng.uniform(0, 30), transcription_time=rng.uniform(0, 900),
+                                success=rng.random() > 0.2)
+
+    reloaded = ProcessingStats(stats_file=f)
+
+    assert list(reloaded.stats["summary"].items()) == list(s.stats["summary"].items())
+
+
+def test_batch_estimate_scans_history_once_for_unknown_extensions(tmp_path, monkeypatch):
+    s = ProcessingStats(stats_file=str(tmp_path / "stats.json"))
+    s.add_processing_record("a.mp3", 1024 * 1024, duration=100.0,
+                            conversion_time=10.0, transcription_time=40.0, success=True)
+    calls = []
+    original = ProcessingStats._fallback_ratio
+    monkeypatch.setattr(ProcessingStats, "_fallback_ratio", lambda self: calls.append(1) or original(self))
+
+    batch = s.estimate_batch_time([("b.mp3", 100.0), ("c.wav", 100.0), ("d.ogg", 200.0), ("e.ogg", 0.0)])
+
+    assert calls == [1]
+    assert batch["per_file"] == {"b.mp3": 50.0, "c.wav": 50.0, "d.ogg": 100.0, "e.ogg": 30.0}
+    assert batch["per_file"]["c.wav"] == s.estimate_processing_time("c.wav", 100.0)
@@ -1,8 +1,9 @@
 """Progress orchestration tests for the transcription processor."""
 
+import threading
 from pathlib import Path
 
-from src.core.processor import TranscriptionProcessor
+from src.core.processor import PrefetchedConversion, TranscriptionProcessor
 from src.core.progress import ProgressEvent
 from src.core.subtitles import SubtitleOptions
 
@@ -417,3 +418,115 @@ def test_missing_hf_token_is_exposed_in_result_metadata(monkeypatch, tmp_path):
         "backend": "pyannote",
         "error": "Диаризация pyannote требует HuggingFace read-токен с префиксом hf_.",
     }
+
+
+def test_prefetched_conversion_skips_second_ffmpeg_run(monkeypatch, tmp_path):
+    path = _prepare_inputs(tmp_path)
+    processor = TranscriptionProcessor(DummyLoader([1.0]), DummyStats())
+    converted = []
+
+    def convert(filepath, output_dir, **kwargs):
+        converted.append(filepath)
+        return str(path)
+
+    monkeypatch.setattr(processor.audio_converter, "convert_to_wav", convert)
+    monkeypatch.setattr("src.core.processor.AudioConverter.get_media_duration", lambda _path: 10.0)
+
+    prefetched = processor.prefetch_conversion(str(path), str(path.parent)).result()
+    assert prefetched.media_duration == 10.0
+    assert prefetched.temp_audio == str(path)
+
+    processor.progress_callback = lambda _event: None
+    result = processor.process_file(
+        str(path), str(path.parent), 0, 1, original_filename=path.name, prefetched=prefetched,
+    )
+
+    assert result["success"]
+    assert result["media_duration"] == 10.0
+    assert converted == [str(path)]
+
+
+def test_mismatched_prefetch_removes_its_temporary_wav(monkeypatch, tmp_path):
+    path = _prepare_inputs(tmp_path)
+    temp_wav = tmp_path / "temp_other.wav"
+    temp_wav.write_bytes(b"wav")
+    processor = TranscriptionProcessor(DummyLoader([1.0]), DummyStats())
+    monkeypatch.setattr(processor.audio_converter, "convert_to_wav", lambda filepath, output_dir, **kwargs: str(path))
+    monkeypatch.setattr("src.core.processor.AudioConverter.get_media_duration", lambda _path: 1.0)
+    prefetched = PrefetchedConversion(
+        filepath=str(tmp_path / "other.mp3"),
+        output_dir=str(tmp_path),
+        media_duration=1.0,
+        temp_audio=str(temp_wav),
+        conversion_time=0.1,
+    )
+
+    processor.progress_callback = lambda _event: None
+    result = processor.process_file(
+        str(path), str(path.parent), 0, 1, original_filename=path.name, prefetched=prefetched,
+    )
+
+    assert result["success"]
+    assert not temp_wav.exists()
+    assert path.exists()
+
+
+def test_discarded_prefetch_removes_temporary_wav(monkeypatch, tmp_path):
+    path = _prepare_inputs(tmp_path)
+    temp_wav = tmp_path / "temp_next.wav"
+    processor = TranscriptionProcessor(DummyLoader([1.0]), DummyStats())
+
+    def convert(filepath, output_dir, **kwargs):
+        temp_wav.write_bytes(b"wav")
+        return str(temp_wav)
+
+    monkeypatch.setattr(processor.audio_converter, "convert_to_wav", convert)
+    monkeypatch.setattr("src.core.processor.AudioConverter.get_media_duration", lambda _path: 1.0)
+
+    prefetch = processor.prefetch_conversion(str(path), str(tmp_path))
+    prefetch.discard()
+    prefetch._thread.join(timeout=5)
+
+    assert not temp_wav.exists()
+    assert path.exists()
+
+
+def test_discard_cancels_running_conversion_without_waiting(monkeypatch, tmp_path):
+    path = _prepare_inputs(tmp_path)
+    temp_wav = tmp_path / "temp_next.wav"
+    processor = TranscriptionProcessor(DummyLoader([1.0]), DummyStats())
+    started = threading.Event()
+
+    def convert(filepath, output_dir, cancel_event, **kwargs):
+        started.set()
+        # «ffmpeg» работает, пока его не отменят
+        assert cancel_event.wait(timeout=5)
+        temp_wav.write_bytes(b"partial")
+        return str(temp_wav)
+
+    monkeypatch.setattr(processor.audio_converter, "convert_to_wav", convert)
+    monkeypatch.setattr("src.core.processor.AudioConverter.get_media_duration", lambda _path: 1.0)
+
+    prefetch = processor.prefetch_conversion(str(path), str(tmp_path))
+    assert started.wait(timeout=5)
+    prefetch.discard()
+    prefetch._thread.join(timeout=5)
+
+    assert not prefetch._thread.is_alive()
+    assert not temp_wav.exists()
+
+
+def test_prefetch_log_lines_are_tagged_with_their_file(monkeypatch, tmp_path):
+    path = _prepare_inputs(tmp_path)
+    processor = TranscriptionProcessor(DummyLoader([1.0]), DummyStats())
+    messages = []
+    processor.audio_converter.logger = messages.append
+
+    def convert(filepath, output_dir, **kwargs):
+        raise RuntimeError("boom")
+
+    monkeypatch.setattr(processor.audio_converter, "convert_to_wav", convert)
+    monkeypatch.setattr("src.core.processor.AudioConverter.get_media_duration", lambda _path: 1.0)
+
+    assert processor.prefetch_conversion(str(path), str(tmp_path)).result().temp_audio is None
+    assert messages == [f"[{path.name}] Ошибка фоновой конвертации: boom"]
@@ -3,6 +3,7 @@ import sys
 import types
 
 import numpy as np
+import pytest
 
 from src.utils import pyannote_patch, torch_patch
 
@@ -121,3 +122,117 @@ def test_torch_load_patch_is_reapplied_after_runtime_switch(monkeypatch):
     monkeypatch.setitem(sys.modules, "torch", second)
     assert torch_patch.apply_torch_load_patch() is True
     assert second.load("model.pt")[2]["weights_only"] is False
+
+
+@pytest.mark.parametrize("version,expected", [
+    ("2.6.0", (2, 6)),
+    ("2.6.0+cu124", (2, 6)),
+    ("2.6.0.dev20240101", (2, 6)),
+    ("2.10.0a0", (2, 10)),
+    ("3", (3, 0)),
+    ("unknown", (0, 0)),
+])
+def test_parse_torch_version(version, expected):
+    assert torch_patch._parse_torch_version(version) == expected
+
+
+def test_torch_load_patch_keeps_original_signature(monkeypatch):
+    import inspect
+
+    monkeypatch.delenv("GIGAAM_DISABLE_TORCH_PATCH", raising=False)
+    module = types.ModuleType("torch")
+    module.__version__ = "2.6.0"
+
+    def load(f, map_location=None, *, weights_only=None):
+        return weights_only
+
+    module.load = load
+    monkeypatch.setitem(sys.modules, "torch", module)
+
+    assert torch_patch.apply_torch_load_patch() is True
+    assert module.load.__wrapped__ is load
+    assert inspect.signature(module.load) == inspect.signature(load)
+    assert module.load("model.pt", weights_only=None) is False
+
+
+def test_soundfile_loader_reads_through_float32_buffer(monkeypatch, tmp_path):
+    reads = []
+    fake_torch = types.SimpleNamespace(from_numpy=lambda array: array)
+    monkeypatch.setattr(pyannote_patch, "_read_audio_float32", lambda path: reads.append(path) or (np.zeros((4, 1)), 16000))
+    monkeypatch.setitem(sys.modules, "torch", fake_torch)
+
+    path = tmp_path / "a.wav"
+    loaded = pyannote_patch._load_audio_with_soundfile(path)
+
+    assert loaded["sample_rate"] == 16000
+    assert loaded["waveform"].shape == (1, 4)
+    assert reads == [str(path)]
+
+
+def test_waveform_adapter_shares_mono_float32_buffer():
+    fake_torch = types.SimpleNamespace(from_numpy=lambda array: array)
+    mono = np.arange(8, dtype=np.float32).reshape(8, 1)
+    stereo64 = np.ones((8, 2))
+
+    mono_waveform = pyannote_patch._audio_array_to_waveform(mono, fake_torch)
+    stereo_waveform = pyannote_patch._audio_array_to_waveform(stereo64, fake_torch)
+
+    assert mono_waveform.shape == (1, 8) and np.shares_memory(mono_waveform, mono)
+    assert stereo_waveform.dtype == np.float32 and stereo_waveform.flags.c_contiguous
+    assert stereo_waveform.shape == (2, 8)
+
+
+def test_import_hook_patches_pyannote_on_first_import(monkeypatch, tmp_path):
+    package = tmp_path / "pyannote" / "audio"
+    package.mkdir(parents=True)
+    (package / "__init__.py").write_text("READY = True\n", encoding="utf-8")
+    monkeypatch.syspath_prepend(str(tmp_path))
+    for name in ("pyannote", "pyannote.audio"):
+        monkeypatch.delitem(sys.modules, name, raising=False)
+    applied = []
+    monkeypatch.setattr(pyannote_patch, "_prepare_pyannote_import", lambda: applied.append("prepare"))
+    monkeypatch.setattr(pyannote_patch, "apply_pyannote_patch", lambda: applied.append(sys.modules["pyannote.audio"].READY))
+    monkeypatch.setattr(sys, "meta_path", list(sys.meta_path))
+
+    pyannote_patch.install_pyannote_import_hook()
+    pyannote_patch.install_pyannote_import_hook()
+    assert applied == []
+    try:
+        module = importlib.import_module("pyannote.audio")
+    finally:
+        sys.modules.pop("pyannote.audio", None)
+        sys.modules.pop("pyannote", None)
+
+    assert module.READY is True
+    assert applied == ["prepare", True]
+    assert not any(isinstance(f, pyannote_patch._PyannoteImportHook) for f in sys.meta_path)
+
+
+def test_read_audio_float32_fills_preallocated_frames_by_channels(tmp_path):
+    import soundfile as sf
+
+    path = tmp_path / "stereo.wav"
+    stereo = np.stack([np.linspace(-1, 1, 800), np.zeros(800)], axis=1)
+    sf.write(path, stereo, 8000, subtype="FLOAT")
+
+    samples, sample_rate = pyannote_patch._read_audio_float32(str(path))
+
+    assert sample_rate == 8000
+    assert samples.dtype == np.float32 and samples.shape == (800, 2)
+    np.testing.assert_allclose(samples, stereo, atol=1e-6)
+
+
+def test_pipeline_call_is_wrapped_only_without_working_torchcodec(monkeypatch):
+    real_torchcodec = types.ModuleType("torchcodec")
+    mock_torchcodec = types.ModuleType("torchcodec")
+    mock_torchcodec._gigaam_mock = True
+
+    monkeypatch.setattr(sys, "platform", "linux")
+    monkeypatch.setitem(sys.modules, "torchcodec", real_torchcodec)
+    assert pyannote_patch._needs_soundfile_pipeline_call() is False
+    monkeypatch.setitem(sys.modules, "torchcodec", mock_torchcodec)
+    assert pyannote_patch._needs_soundfile_pipeline_call() is True
+
+    monkeypatch.setattr(sys, "platform", "win32")
+    monkeypatch.setitem(sys.modules, "torchcodec", real_torchcodec)
+    assert pyannote_patch._needs_soundfile_pipeline_call() is True
@@ -12,11 +12,18 @@ from src.utils.time_formatter import TimeFormatter
     (3599, "59:59"),
     (3600, "01:00:00"),
     (3661, "01:01:01"),
+    (3599.9, "59:59"),
+    (360000, "100:00:00"),
 ])
 def test_format_timestamp(seconds, expected):
     assert TimeFormatter.format_timestamp(seconds) == expected
 
 
+def test_format_timestamps_matches_scalar_formatting():
+    values = [0, 59.99, 60, 3599.5, 3600, 3661.2, 86399, 360000.5, -5, 12.0]
+    assert TimeFormatter.format_timestamps(values) == [TimeFormatter.format_timestamp(v) for v in values]
+
+
 @pytest.mark.parametrize("seconds,expected", [
     (0, "0 сек"),
     (59, "59 сек"),
@@ -24,6 +31,8 @@ def test_format_timestamp(seconds, expected):
     (90, "1 мин 30 сек"),
     (3600, "1 ч 0 мин"),
     (3700, "1 ч 1 мин"),
+    (59.9, "59 сек"),
+    (3599.9, "59 мин 59 сек"),
 ])
 def test_format_duration(seconds, expected):
     assert TimeFormatter.format_duration(seconds) == expected
@@ -1,5 +1,9 @@
 """Тесты пользовательских настроек (Phase 4.1)."""
 
+import json
+import os
+
+from src.utils import user_settings
 from src.utils.user_settings import UserSettings
 
 
@@ -35,3 +39,77 @@ def test_set_last_files_dir_from_file_path(tmp_path):
     s.set_last_files_dir(str(media))
     # Должна сохраниться директория файла, а не сам файл
     assert s.get_last_files_dir() == str(tmp_path)
+
+
+def test_burst_of_changes_is_written_once(tmp_path, monkeypatch):
+    writes = []
+    monkeypatch.setattr(user_settings, "save_bytes_atomic", lambda path, payload: writes.append(json.loads(payload)))
+    s = UserSettings(settings_file=str(tmp_path / "settings.json"))
+    for index in range(10):
+        s.set_value("counter", index)
+    assert writes == []
+
+    s.flush()
+    s.flush()
+    assert writes == [{"counter": 9}]
+
+
+def test_unchanged_settings_are_not_rewritten(tmp_path, monkeypatch):
+    writes = []
+    monkeypatch.setattr(user_settings, "save_bytes_atomic", lambda path, payload: writes.append(payload))
+    s = UserSettings(settings_file=str(tmp_path / "settings.json"))
+    s.set_value("theme", "dark")
+    s.flush()
+    s.set_value("theme", "dark")
+    s.flush()
+    s.set_value("theme", "light")
+    s.flush()
+    assert len(writes) == 2
+
+
+def test_dir_check_is_cached_between_getter_calls(tmp_path, monkeypatch):
+    s = UserSettings(settings_file=str(tmp_path / "settings.json"))
+    s.set_last_output_dir(str(tmp_path))
+    checks = []
+    real_isdir = user_settings.os.path.isdir
+    monkeypatch.setattr(user_settings.os.path, "isdir", lambda p: checks.append(p) or real_isdir(p))
+
+    assert s.get_last_output_dir() == str(tmp_path)
+    assert s.get_last_output_dir() == str(tmp_path)
+    assert checks == [str(tmp_path)]
+
+
+def test_pending_save_uses_snapshot_taken_by_setter(tmp_path, monkeypatch):
+    writes = []
+    monkeypatch.setattr(user_settings, "save_bytes_atomic", lambda path, payload: writes.append(json.loads(payload)))
+    s = UserSettings(settings_file=str(tmp_path / "settings.json"))
+    s.set_value("files", ["a.wav"])
+    # Изменение без _save_settings не должно попасть в уже запланированную запись
+    s.settings["files"].append("b.wav")
+    s.flush()
+    assert writes == [{"files": ["a.wav"]}]
+
+
+def test_saver_thread_writes_after_delay(tmp_path, monkeypatch):
+    import time
+
+    monkeypatch.setattr(user_settings, "_SAVE_DELAY_SEC", 0.01)
+    f = str(tmp_path / "settings.json")
+    s = UserSettings(settings_file=f)
+    s.set_value("theme", "light")
+    deadline = time.monotonic() + 5
+    # Файл появляется атомарно (os.replace), поэтому существует — значит дописан
+    while not os.path.exists(f):
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+    assert json.loads(open(f, encoding="utf-8").read()) == {"theme": "light"}
+
+
+def test_settings_serialization_matches_stdlib_json(monkeypatch):
+    settings = {"theme": "тёмная", "files": ["a.wav"], "big": 2**70}
+    expected = json.dumps(settings, ensure_ascii=False, indent=2).encode("utf-8")
+    # Значение, которое orjson не принимает, уходит в стандартный json
+    assert user_settings._dump_settings(settings) == expected
+    # Без orjson (так работает сборка) пишет стандартный json
+    monkeypatch.setattr(user_settings, "orjson", None)
+    assert user_settings._dump_settings(settings) == expected
@@ -63,8 +63,8 @@ warnings.filterwarnings("ignore", message=".*speechbrain.pretrained.*deprecated.
 
 if HF_TOKEN and HF_TOKEN.startswith("hf_"):
     try:
-        from src.utils.pyannote_patch import apply_pyannote_patch
-        apply_pyannote_patch()
+        from src.utils.pyannote_patch import install_pyannote_import_hook
+        install_pyannote_import_hook()
     except Exception:
         print("ПРЕДУПРЕЖДЕНИЕ: pyannote patch не применен; продолжим без него.")
 